@@ -80,9 +80,12 @@ class TestIntegrationGithubOrgClient(unittest.TestCase):
                   [
                       cls.org_payload, cls.repos_payload,
                       cls.org_payload, cls.repos_payload
-                  ]
+                  ],
+                  'return_value.status_code': 200,
+                  'return_value.headers': {}
                   }
-        cls.get_patcher = patch('requests.get', **config)
+        # utils.get_json sends requests through a shared requests.Session
+        cls.get_patcher = patch('requests.Session.get', **config)
         cls.mock = cls.get_patcher.start()
 
     def test_public_repos(self):
@@ -2,10 +2,28 @@
 """
 Test for access_nested_map function
 """
+import json
+import time
+import asyncio
+import tempfile
+import threading
 import unittest
 import requests
-from unittest.mock import patch
-from utils import access_nested_map, get_json, memoize
+from unittest.mock import Mock, patch
+from utils import (
+    DEFAULT_TIMEOUT,
+    OfflineCacheMiss,
+    RateLimiter,
+    RateLimitExceeded,
+    access_nested_map,
+    clear_response_cache,
+    configure_disk_cache,
+    fetch_orgs,
+    get_json,
+    iter_repos,
+    clear_memoized,
+    memoize,
+)
 from typing import Mapping, Sequence, Any
 from parameterized import parameterized
 
@@ -52,22 +70,288 @@ class TestGetJson(unittest.TestCase):
     """
     Test the get_json function
     """
+    def setUp(self) -> None:
+        """Start every test without cached responses"""
+        clear_response_cache()
+
     @parameterized.expand([
         ("http://example.com", {"payload": True}),
         ("http://holberton.io", {"payload": False})
     ])
-    @patch("requests.get")
-    def test_get_json(self, test_url, test_payload, mock_requests_get):
+    @patch("requests.Session.get")
+    def test_get_json(self, test_url, test_payload, mock_session_get):
         """
         Test the get_json method to ensure it returns the expected output.
         Args:
             url: url to send http request to
             payload: expected json response
         """
-        mock_requests_get.return_value.json.return_value = test_payload
+        mock_session_get.return_value.json.return_value = test_payload
+        mock_session_get.return_value.headers = {}
         result = get_json(test_url)
         self.assertEqual(result, test_payload)
-        mock_requests_get.assert_called_once_with(test_url)
+        mock_session_get.assert_called_once_with(
+            test_url, headers={}, timeout=DEFAULT_TIMEOUT)
+
+    @patch("requests.Session.get")
+    def test_get_json_not_modified(self, mock_session_get):
+        """
+        Test that a 304 answer to a conditional request reuses the
+        cached payload without parsing the body again
+        """
+        test_url = "http://example.com"
+        fresh = Mock(status_code=200, headers={"ETag": '"v1"'})
+        fresh.json.return_value = {"payload": True}
+        not_modified = Mock(status_code=304, headers={"ETag": '"v1"'})
+        mock_session_get.side_effect = [fresh, not_modified]
+
+        self.assertEqual(get_json(test_url), {"payload": True})
+        self.assertEqual(get_json(test_url), {"payload": True})
+        mock_session_get.assert_called_with(
+            test_url, headers={"If-None-Match": '"v1"'},
+            timeout=DEFAULT_TIMEOUT)
+        not_modified.json.assert_not_called()
+
+    @patch("requests.Session.get")
+    def test_get_json_error_not_cached(self, mock_session_get):
+        """
+        Test that an error response's validators are never sent back
+        """
+        test_url = "http://example.com"
+        error = Mock(status_code=404, headers={"ETag": '"missing"'})
+        error.json.return_value = {"message": "Not Found"}
+        fresh = Mock(status_code=200, headers={})
+        fresh.json.return_value = {"payload": True}
+        mock_session_get.side_effect = [error, fresh]
+
+        get_json(test_url)
+        self.assertEqual(get_json(test_url), {"payload": True})
+        mock_session_get.assert_called_with(
+            test_url, headers={}, timeout=DEFAULT_TIMEOUT)
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Test get_json on top of the on-disk response cache
+    """
+    def setUp(self) -> None:
+        """Give every test an empty cache directory"""
+        clear_response_cache()
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.addCleanup(configure_disk_cache, None)
+
+    @staticmethod
+    def response(payload, status_code=200, headers=None):
+        """Build a fake response carrying payload"""
+        response = Mock(status_code=status_code, headers=headers or {})
+        response.content = json.dumps(payload).encode()
+        response.json.return_value = payload
+        return response
+
+    @patch("requests.Session.get")
+    def test_fresh_entry_skips_request(self, mock_session_get):
+        """
+        Test that an entry within its TTL is served from disk, also by a
+        cache opened later on the same directory
+        """
+        mock_session_get.return_value = self.response({"payload": True})
+        configure_disk_cache(self.directory.name, ttl=60)
+        get_json("http://example.com")
+        configure_disk_cache(self.directory.name, ttl=60)
+        self.assertEqual(get_json("http://example.com"), {"payload": True})
+        mock_session_get.assert_called_once()
+
+    @patch("requests.Session.get")
+    def test_stale_entry_revalidates(self, mock_session_get):
+        """
+        Test that an expired entry is revalidated with its ETag
+        """
+        mock_session_get.side_effect = [
+            self.response({"payload": True}, headers={"ETag": '"v1"'}),
+            self.response(None, status_code=304),
+        ]
+        configure_disk_cache(self.directory.name, ttl=0)
+        get_json("http://example.com")
+        clear_response_cache()
+        self.assertEqual(get_json("http://example.com"), {"payload": True})
+        mock_session_get.assert_called_with(
+            "http://example.com", headers={"If-None-Match": '"v1"'},
+            timeout=DEFAULT_TIMEOUT)
+
+    @patch("requests.Session.get")
+    def test_offline(self, mock_session_get):
+        """
+        Test that offline mode serves stale entries and never hits the
+        network, raising OfflineCacheMiss for unknown URLs
+        """
+        mock_session_get.return_value = self.response({"payload": True})
+        configure_disk_cache(self.directory.name, ttl=0)
+        get_json("http://example.com")
+        configure_disk_cache(self.directory.name, ttl=0, offline=True)
+        self.assertEqual(get_json("http://example.com"), {"payload": True})
+        with self.assertRaises(OfflineCacheMiss):
+            get_json("http://holberton.io")
+        mock_session_get.assert_called_once()
+
+    @patch("requests.Session.get")
+    def test_missing_body_is_a_miss(self, mock_session_get):
+        """
+        Test that a body evicted by another process is fetched again
+        instead of raising
+        """
+        mock_session_get.return_value = self.response({"payload": True})
+        configure_disk_cache(self.directory.name, ttl=60)
+        get_json("http://example.com")
+        cache = configure_disk_cache(self.directory.name, ttl=60)
+        with cache._connection() as conn:
+            conn.execute("DELETE FROM bodies")
+        self.assertEqual(get_json("http://example.com"), {"payload": True})
+        self.assertEqual(mock_session_get.call_count, 2)
+
+    @patch("requests.Session.get")
+    def test_eviction(self, mock_session_get):
+        """
+        Test that the least recently used URL is evicted past max_bytes
+        """
+        payloads = [{"n": n, "data": "x" * 100 * n} for n in range(3)]
+        mock_session_get.side_effect = [self.response(payload)
+                                        for payload in payloads]
+        cache = configure_disk_cache(self.directory.name, ttl=60,
+                                     max_bytes=60)
+        for n in range(3):
+            get_json("http://example.com/{}".format(n))
+        self.assertIsNone(cache.lookup("http://example.com/0"))
+        self.assertIsNotNone(cache.lookup("http://example.com/2"))
+
+
+class TestFetchOrgs(unittest.TestCase):
+    """
+    Test concurrent organization fetching and rate-limit handling
+    """
+    def setUp(self) -> None:
+        """Start every test without cached responses"""
+        clear_response_cache()
+
+    @staticmethod
+    def response(payload, status_code=200, headers=None):
+        """Build a fake response carrying payload"""
+        response = Mock(status_code=status_code, headers=headers or {})
+        response.json.return_value = payload
+        return response
+
+    @patch("requests.Session.get")
+    def test_fetch_orgs(self, mock_session_get):
+        """
+        Test that every organization comes back with its repos, and a
+        failing one reports its error without stopping the rest
+        """
+        def get(url, **kwargs):
+            if url.endswith("/orgs/google"):
+                return self.response({"repos_url": "http://repos/google"})
+            if url == "http://repos/google":
+                return self.response([{"name": "truth"}])
+            raise requests.ConnectionError(url)
+        mock_session_get.side_effect = get
+
+        results = {result.name: result
+                   for result in fetch_orgs(["google", "abc"])}
+        self.assertEqual(results["google"].repos, [{"name": "truth"}])
+        self.assertIsNone(results["google"].error)
+        self.assertIsInstance(results["abc"].error, requests.ConnectionError)
+
+    @patch("requests.Session.get")
+    def test_error_status_raises(self, mock_session_get):
+        """
+        Test that a non-2xx answer raises instead of becoming a payload
+        """
+        response = requests.Response()
+        response.status_code = 404
+        response._content = b'{"message": "Not Found"}'
+        mock_session_get.return_value = response
+        with self.assertRaises(requests.HTTPError):
+            list(iter_repos("http://example.com"))
+
+    @patch("utils.rate_limiter", RateLimiter())
+    @patch("utils.time.sleep")
+    @patch("requests.Session.get")
+    def test_rate_limit_exceeded(self, mock_session_get, mock_sleep):
+        """
+        Test that a request still rejected after every retry raises
+        instead of returning the error body
+        """
+        mock_session_get.return_value = self.response(
+            {"message": "API rate limit exceeded"}, 403,
+            {"X-RateLimit-Remaining": "0",
+             "X-RateLimit-Reset": str(int(time.time()) + 60)})
+        with self.assertRaises(RateLimitExceeded):
+            get_json("http://example.com")
+
+    @patch("utils.rate_limiter", RateLimiter())
+    @patch("utils.time.sleep")
+    @patch("requests.Session.get")
+    def test_retry_after(self, mock_session_get, mock_sleep):
+        """
+        Test that a 429 with Retry-After waits and sends the request again
+        """
+        mock_session_get.side_effect = [
+            self.response({}, 429, {"Retry-After": "30"}),
+            self.response({"payload": True}),
+        ]
+        self.assertEqual(get_json("http://example.com"), {"payload": True})
+        self.assertEqual(mock_session_get.call_count, 2)
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 30, delta=1)
+
+
+class TestIterRepos(unittest.TestCase):
+    """
+    Test lazy repo streaming across Link-paginated pages
+    """
+    pages = {
+        "http://repos?page=1": ([
+            {"name": "a", "license": {"key": "mit"}},
+            {"name": "b"},
+        ], '<http://repos?page=2>; rel="next", <http://repos?page=2>; '
+           'rel="last"'),
+        "http://repos?page=2": ([
+            {"name": "c", "license": {"key": "apache-2.0"}},
+        ], '<http://repos?page=1>; rel="first"'),
+    }
+
+    def setUp(self) -> None:
+        """Serve self.pages from a patched session"""
+        clear_response_cache()
+        patcher = patch("requests.Session.get", side_effect=self.get)
+        self.mock_session_get = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def get(self, url, **kwargs):
+        """Fake Session.get answering from self.pages"""
+        payload, link = self.pages[url]
+        response = Mock(status_code=200, headers={"Link": link})
+        response.json.return_value = payload
+        return response
+
+    @parameterized.expand([
+        (None, ["a", "b", "c"]),
+        ("apache-2.0", ["c"]),
+        ("XLICENSE", []),
+    ])
+    def test_iter_repos(self, license_key, expected):
+        """
+        Test that every page is followed and license filtering applies
+        """
+        repos = iter_repos("http://repos?page=1", license_key)
+        self.assertEqual([repo["name"] for repo in repos], expected)
+
+    def test_iter_repos_stops_early(self):
+        """
+        Test that nothing past the prefetched next page is requested
+        """
+        repos = iter_repos("http://repos?page=1")
+        self.assertEqual(next(repos)["name"], "a")
+        repos.close()
+        self.assertLessEqual(self.mock_session_get.call_count, 2)
 
 
 class TestMemoize(unittest.TestCase):
@@ -92,4 +376,101 @@ class TestMemoize(unittest.TestCase):
             test.a_property()
             mock_object.assert_called_once()
 
+    def test_memoize_single_flight(self):
+        """
+        Test that concurrent first accesses compute the value only once
+        """
+        calls = []
+
+        class TestClass:
+
+            @memoize
+            def a_property(self):
+                calls.append(1)
+                time.sleep(0.05)
+                return 42
+
+        test = TestClass()
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(test.a_property))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [42] * 8)
+        self.assertEqual(len(calls), 1)
+
+    def test_memoize_ttl_and_invalidation(self):
+        """
+        Test that results expire after ttl and on explicit invalidation
+        """
+        class TestClass:
+
+            def a_method(self):
+                return 42
+
+            @memoize(ttl=60)
+            def a_property(self):
+                return self.a_method()
+
+        with patch.object(TestClass, 'a_method') as mock_object:
+            test = TestClass()
+            test.a_property
+            del test.a_property
+            test.a_property
+            self.assertEqual(mock_object.call_count, 2)
+            with patch("utils.time.monotonic", return_value=1e12):
+                test.a_property
+            self.assertEqual(mock_object.call_count, 3)
+
+    def test_memoize_arguments(self):
+        """
+        Test per-argument caching with LRU eviction past maxsize
+        """
+        class TestClass:
+
+            def a_method(self, value):
+                return value
+
+            @memoize(maxsize=2)
+            def double(self, value):
+                return self.a_method(value) * 2
+
+        with patch.object(TestClass, 'a_method',
+                          side_effect=lambda value: value) as mock_object:
+            test = TestClass()
+            self.assertEqual([test.double(n) for n in (1, 2, 1, 3, 1)],
+                             [2, 4, 2, 6, 2])
+            self.assertEqual(mock_object.call_count, 3)
+            test.double(2)
+            self.assertEqual(mock_object.call_count, 4)
+            clear_memoized(test, "double")
+            test.double(1)
+            self.assertEqual(mock_object.call_count, 5)
+
+    def test_memoize_async(self):
+        """
+        Test that concurrent awaits of an async property share one call
+        """
+        calls = []
+
+        class TestClass:
+
+            @memoize
+            async def a_property(self):
+                calls.append(1)
+                await asyncio.sleep(0.01)
+                return 42
+
+        async def main():
+            test = TestClass()
+            first = await asyncio.gather(*[test.a_property
+                                           for _ in range(5)])
+            return first + [await test.a_property]
+
+        self.assertEqual(asyncio.run(main()), [42] * 6)
+        self.assertEqual(len(calls), 1)
+
 # Add a newline at the end of the file
@@ -1,22 +1,90 @@
 #!/usr/bin/env python3
 """Generic utilities for github org client.
 """
+import os
+import json
+import asyncio
+import inspect
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
 import requests
-from functools import wraps
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from functools import partial, wraps
+from requests.adapters import HTTPAdapter
+from requests.utils import parse_header_links
 from typing import (
     Mapping,
     Sequence,
     Any,
     Dict,
     Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Tuple,
 )
 
 __all__ = [
     "access_nested_map",
     "get_json",
+    "get_session",
+    "clear_response_cache",
+    "DiskCache",
+    "OfflineCacheMiss",
+    "configure_disk_cache",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "fetch_orgs",
+    "iter_pages",
+    "iter_repos",
     "memoize",
+    "clear_memoized",
 ]
 
+# (connect, read) timeouts in seconds for every get_json request
+DEFAULT_TIMEOUT = (3.05, 10)
+# Keep-alive connections kept per host by the shared session
+POOL_MAXSIZE = 10
+# Most URLs whose payload and validators are kept for conditional requests
+RESPONSE_CACHE_SIZE = 256
+
+# (ETag, Last-Modified, parsed payload, next page URL) kept for one URL
+CachedResponse = Tuple[Optional[str], Optional[str], Any, Optional[str]]
+
+_session = None  # type: Optional[requests.Session]
+_session_lock = threading.Lock()
+# url -> CachedResponse, least recently used first
+_responses = OrderedDict()  # type: OrderedDict
+_responses_lock = threading.Lock()
+
+# Same URL GithubOrgClient.ORG_URL points at
+GITHUB_ORG_URL = "https://api.github.com/orgs/{org}"
+# Requests fetch_orgs runs at once, kept within the session's pool
+FETCH_CONCURRENCY = 8
+# Times get_json re-sends a request rejected by the rate limit
+RATE_LIMIT_RETRIES = 3
+
+# Results memoize keeps per instance for each method taking arguments
+MEMOIZE_MAXSIZE = 128
+# Instance attribute prefix under which memoize keeps its per-method state
+_MEMO_PREFIX = "_memoized_"
+
+# Disk cache defaults; GET_JSON_CACHE_DIR enables it for the whole process
+DISK_CACHE_TTL = 300
+DISK_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Parsed payloads kept in memory per disk cache, by body digest
+PARSED_CACHE_SIZE = 128
+
+# One URL's row in the disk cache index
+StoredResponse = namedtuple(
+    "StoredResponse",
+    ["digest", "etag", "last_modified", "fetched_at", "next_url"])
+
 
 def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     """Access nested map with key path.
@@ -40,15 +108,587 @@ def access_nested_map(nested_map: Mapping, path: Sequence) -> Any:
     return nested_map
 
 
+def get_session() -> requests.Session:
+    """Return the shared keep-alive session, creating it on first use.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_MAXSIZE,
+                                  pool_maxsize=POOL_MAXSIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def clear_response_cache() -> None:
+    """Forget every cached payload and validator.
+    """
+    with _responses_lock:
+        _responses.clear()
+
+
+def _cached_response(url: str) -> Optional[CachedResponse]:
+    with _responses_lock:
+        entry = _responses.get(url)
+        if entry is not None:
+            _responses.move_to_end(url)
+        return entry
+
+
+def _store_response(url: str, etag: Optional[str],
+                    last_modified: Optional[str], payload: Any,
+                    next_url: Optional[str] = None) -> None:
+    with _responses_lock:
+        _responses[url] = (etag, last_modified, payload, next_url)
+        _responses.move_to_end(url)
+        while len(_responses) > RESPONSE_CACHE_SIZE:
+            _responses.popitem(last=False)
+
+
+class RateLimiter:
+    """Holds requests back while the server reports its limit exhausted.
+
+    Every response is passed to update(): a Retry-After header, or
+    X-RateLimit-Remaining of 0 with its X-RateLimit-Reset, moves the
+    resume time forward, and wait() sleeps until then. Shared by all
+    threads so one rejected request pauses every worker.
+    """
+    def __init__(self) -> None:
+        self._resume_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Sleep until requests may be sent again.
+        """
+        with self._lock:
+            delay = self._resume_at - time.time()
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, response: requests.Response) -> bool:
+        """Record the limits response reports; True if requests must pause.
+        """
+        headers = response.headers
+        resume_at = None
+        try:
+            retry_after = headers.get("Retry-After")
+            if retry_after:
+                if retry_after.strip().isdigit():
+                    resume_at = time.time() + int(retry_after)
+                else:
+                    resume_at = parsedate_to_datetime(retry_after).timestamp()
+            elif str(headers.get("X-RateLimit-Remaining")) == "0":
+                resume_at = float(headers.get("X-RateLimit-Reset"))
+        except (TypeError, ValueError):
+            return False
+        if resume_at is None or resume_at <= time.time():
+            return False
+        with self._lock:
+            self._resume_at = max(self._resume_at, resume_at)
+        return True
+
+
+# Process-wide limiter every get_json call goes through
+rate_limiter = RateLimiter()
+
+
+class RateLimitExceeded(requests.HTTPError):
+    """Raised when a request is still rate limited after RATE_LIMIT_RETRIES.
+    """
+
+
+class OfflineCacheMiss(requests.ConnectionError):
+    """Raised in offline mode for a URL the disk cache doesn't hold.
+    """
+
+
+class DiskCache:
+    """Persistent HTTP response cache shared between processes.
+
+    Bodies are stored zlib-compressed under their SHA-256 digest, so
+    identical payloads served from different URLs are kept once. Entries
+    younger than ttl seconds are served without a request; older ones are
+    revalidated with their ETag/Last-Modified. Once the stored bodies
+    exceed max_bytes the least recently used URLs are evicted. In offline
+    mode every stored entry is served regardless of age and misses raise
+    OfflineCacheMiss.
+    """
+    def __init__(self, directory: str, ttl: float = DISK_CACHE_TTL,
+                 max_bytes: int = DISK_CACHE_MAX_BYTES,
+                 offline: bool = False) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "responses.sqlite")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self._local = threading.local()
+        self._parsed = OrderedDict()  # type: OrderedDict
+        self._parsed_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS bodies (
+                    digest TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,
+                    size INTEGER NOT NULL);
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    digest TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    next_url TEXT);
+                CREATE INDEX IF NOT EXISTS responses_accessed
+                    ON responses (accessed_at);
+            """)
+            columns = [row[1] for row in
+                       conn.execute("PRAGMA table_info(responses)")]
+            if "next_url" not in columns:
+                # Caches written before pagination was followed
+                conn.execute("ALTER TABLE responses ADD COLUMN next_url TEXT")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection to the index.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+        return conn
+
+    def lookup(self, url: str) -> Optional[StoredResponse]:
+        """Return the stored entry for url and mark it recently used.
+        """
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT digest, etag, last_modified, fetched_at, next_url"
+                " FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                         (time.time(), url))
+        return StoredResponse(*row)
+
+    def is_fresh(self, stored: StoredResponse) -> bool:
+        """Whether stored can be served without revalidation.
+        """
+        return self.offline or time.time() - stored.fetched_at < self.ttl
+
+    def load(self, stored: StoredResponse) -> Any:
+        """Return the parsed payload of a stored entry.
+
+        Raises KeyError if another process evicted the body since lookup().
+        """
+        with self._parsed_lock:
+            if stored.digest in self._parsed:
+                self._parsed.move_to_end(stored.digest)
+                return self._parsed[stored.digest]
+        row = self._connection().execute(
+            "SELECT data FROM bodies WHERE digest = ?",
+            (stored.digest,)).fetchone()
+        if row is None:
+            raise KeyError(stored.digest)
+        payload = json.loads(zlib.decompress(row[0]))
+        self._remember(stored.digest, payload)
+        return payload
+
+    def discard(self, url: str) -> None:
+        """Forget url, e.g. after its body went missing.
+        """
+        with self._connection() as conn:
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+
+    def revalidated(self, url: str) -> None:
+        """Restart the TTL of url after a 304.
+        """
+        with self._connection() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE url = ?",
+                         (time.time(), url))
+
+    def store(self, url: str, body: bytes, payload: Any,
+              etag: Optional[str] = None,
+              last_modified: Optional[str] = None,
+              next_url: Optional[str] = None) -> None:
+        """Save a response body for url, then evict down to max_bytes.
+        """
+        digest = hashlib.sha256(body).hexdigest()
+        data = zlib.compress(body)
+        now = time.time()
+        with self._connection() as conn:
+            conn.execute("INSERT OR IGNORE INTO bodies VALUES (?, ?, ?)",
+                         (digest, data, len(data)))
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (url, digest, etag,"
+                " last_modified, fetched_at, accessed_at, next_url)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, digest, etag, last_modified, now, now, next_url))
+            self._evict(conn)
+        self._remember(digest, payload)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        total = conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        oldest = conn.execute("SELECT url, digest FROM responses"
+                              " ORDER BY accessed_at").fetchall()
+        for url, digest in oldest:
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            shared = conn.execute(
+                "SELECT 1 FROM responses WHERE digest = ? LIMIT 1",
+                (digest,)).fetchone()
+            if shared is None:
+                size = conn.execute(
+                    "SELECT size FROM bodies WHERE digest = ?",
+                    (digest,)).fetchone()
+                conn.execute("DELETE FROM bodies WHERE digest = ?", (digest,))
+                total -= size[0] if size else 0
+
+    def _remember(self, digest: str, payload: Any) -> None:
+        with self._parsed_lock:
+            self._parsed[digest] = payload
+            self._parsed.move_to_end(digest)
+            while len(self._parsed) > PARSED_CACHE_SIZE:
+                self._parsed.popitem(last=False)
+
+
+def _disk_cache_from_env() -> Optional[DiskCache]:
+    directory = os.environ.get("GET_JSON_CACHE_DIR")
+    if not directory:
+        return None
+    return DiskCache(
+        directory,
+        ttl=float(os.environ.get("GET_JSON_CACHE_TTL", DISK_CACHE_TTL)),
+        max_bytes=int(os.environ.get("GET_JSON_CACHE_MAX_BYTES",
+                                     DISK_CACHE_MAX_BYTES)),
+        offline=os.environ.get("GET_JSON_OFFLINE", "") not in ("", "0"))
+
+
+_disk_cache = _disk_cache_from_env()
+
+
+def configure_disk_cache(directory: Optional[str] = None,
+                         **options: Any) -> Optional[DiskCache]:
+    """Put a DiskCache under get_json, or remove it when directory is None.
+    Parameters
+    ----------
+    directory: str
+        Where the cache lives; created if missing
+    options:
+        ttl, max_bytes and offline, passed to DiskCache
+    """
+    global _disk_cache
+    _disk_cache = DiskCache(directory, **options) if directory else None
+    return _disk_cache
+
+
 def get_json(url: str) -> Dict:
     """Get JSON from remote URL.
+
+    Requests go through the shared keep-alive session. When an earlier
+    response carried an ETag or Last-Modified header the request is made
+    conditional, and a 304 returns the cached payload without re-parsing.
+    With a disk cache configured (configure_disk_cache() or the
+    GET_JSON_CACHE_DIR environment variable) fresh entries are served
+    without any request. The cached payload object is shared between
+    callers, so treat it as read-only.
+    """
+    return _fetch_json(url)[0]
+
+
+def _next_link(response: requests.Response) -> Optional[str]:
+    for link in parse_header_links(response.headers.get("Link", "")):
+        if link.get("rel") == "next":
+            return link.get("url")
+    return None
+
+
+def _fetch_json(url: str) -> Tuple[Any, Optional[str]]:
+    """get_json that also returns the rel="next" URL from the Link header.
+    """
+    disk = _disk_cache
+    stored = disk.lookup(url) if disk is not None else None
+    if stored is not None and disk.is_fresh(stored):
+        try:
+            return disk.load(stored), stored.next_url
+        except KeyError:
+            # Evicted by another process since lookup(): a plain miss
+            disk.discard(url)
+            stored = None
+    if stored is None and disk is not None and disk.offline:
+        raise OfflineCacheMiss("{} is not in the offline cache".format(url))
+
+    headers = {}
+    cached = _cached_response(url)
+    validators = stored[1:3] if stored is not None else cached
+    if validators is not None:
+        etag, last_modified = validators[0], validators[1]
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        rate_limiter.wait()
+        response = get_session().get(url, headers=headers,
+                                     timeout=DEFAULT_TIMEOUT)
+        limited = rate_limiter.update(response)
+        if not (limited and response.status_code in (403, 429)):
+            break
+    else:
+        raise RateLimitExceeded(
+            "{} is still rate limited after {} retries".format(
+                url, RATE_LIMIT_RETRIES), response=response)
+    if response.status_code == 304:
+        if stored is not None:
+            try:
+                payload = disk.load(stored)
+            except KeyError:
+                # Still valid, but the body is gone: fetch it again
+                disk.discard(url)
+                return _fetch_json(url)
+            disk.revalidated(url)
+            return payload, stored.next_url
+        if cached is not None:
+            return cached[2], cached[3]
+
+    # Error bodies are not data: don't hand them to callers as payloads
+    response.raise_for_status()
+    payload = response.json()
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    next_url = _next_link(response)
+    if (etag or last_modified) and response.status_code == 200:
+        # Only a full 200 body may stand in for a later 304
+        _store_response(url, etag, last_modified, payload, next_url)
+    if disk is not None and response.status_code == 200:
+        disk.store(url, response.content, payload, etag, last_modified,
+                   next_url)
+    return payload, next_url
+
+
+# What fetch_orgs yields for one organization; error is None on success
+OrgResult = namedtuple("OrgResult", ["name", "org", "repos", "error"])
+
+
+def _fetch_org(name: str) -> OrgResult:
+    try:
+        org = get_json(GITHUB_ORG_URL.format(org=name))
+        repos = list(iter_repos(org["repos_url"]))
+        return OrgResult(name, org, repos, None)
+    except Exception as e:
+        return OrgResult(name, None, None, e)
+
+
+def fetch_orgs(names: Iterable[str],
+               concurrency: int = FETCH_CONCURRENCY) -> Iterator[OrgResult]:
+    """Fetch the metadata and repos of many organizations concurrently.
+    Parameters
+    ----------
+    names: Iterable[str]
+        Organization logins
+    concurrency: int
+        Most organizations fetched at once
+    Yields OrgResult tuples in completion order; a failed organization
+    carries its exception instead of stopping the others. Requests share
+    get_json's session, caches and rate limiter.
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    futures = [executor.submit(_fetch_org, name) for name in names]
+    try:
+        for future in as_completed(futures):
+            yield future.result()
+    finally:
+        # Stopping early drops the organizations not started yet
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
+def iter_pages(url: str) -> Iterator[Any]:
+    """Yield every page of a paginated resource, following Link rel="next".
+
+    The next page is requested in the background while the caller works
+    on the current one, so at most two pages are held at a time.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    pending = executor.submit(_fetch_json, url)
+    try:
+        while pending is not None:
+            payload, next_url = pending.result()
+            pending = None
+            if next_url:
+                pending = executor.submit(_fetch_json, next_url)
+            yield payload
+    finally:
+        if pending is not None:
+            pending.cancel()
+        executor.shutdown(wait=False)
+
+
+def _license_matches(repo: Dict, license_key: str) -> bool:
+    try:
+        return access_nested_map(repo, ("license", "key")) == license_key
+    except KeyError:
+        return False
+
+
+def iter_repos(repos_url: str,
+               license_key: Optional[str] = None) -> Iterator[Dict]:
+    """Lazily yield the repos behind repos_url across all of its pages.
+    Parameters
+    ----------
+    repos_url: str
+        An organization's repos_url
+    license_key: str
+        Only yield repos under this license, checked as pages arrive
     """
-    response = requests.get(url)
-    return response.json()
+    for page in iter_pages(repos_url):
+        for repo in page:
+            if license_key is None or _license_matches(repo, license_key):
+                yield repo
+
+
+class _MemoCache:
+    """One instance's memoized results for one method.
+
+    Entries are kept least recently used first and dropped past maxsize
+    or once older than their TTL. Keys being computed map to an in-flight
+    marker (threading.Event or asyncio.Future) that other callers wait on
+    instead of computing the same value again.
+    """
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # type: OrderedDict
+        self.inflight = {}  # type: Dict
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        """Return (hit, value); call with self.lock held.
+        """
+        entry = self.entries.get(key)
+        if entry is None:
+            return False, None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.entries[key]
+            return False, None
+        self.entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: Any, value: Any, ttl: Optional[float]) -> None:
+        """Store value for key; call with self.lock held.
+        """
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self.entries[key] = (value, expires_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+
+
+def _memo_cache(instance: Any, attr_name: str, maxsize: int) -> _MemoCache:
+    state = instance.__dict__.get(attr_name)
+    if state is None:
+        # setdefault is atomic, so racing threads end up sharing one cache
+        state = instance.__dict__.setdefault(attr_name, _MemoCache(maxsize))
+    return state
+
+
+def _call_memoized(cache: _MemoCache, key: Any, compute: Callable,
+                   ttl: Optional[float]) -> Any:
+    while True:
+        with cache.lock:
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            event = cache.inflight.get(key)
+            owner = event is None
+            if owner:
+                event = cache.inflight[key] = threading.Event()
+        if not owner:
+            # Another thread is computing it; if that fails, try ourselves
+            event.wait()
+            continue
+        try:
+            value = compute()
+            with cache.lock:
+                cache.set(key, value, ttl)
+            return value
+        finally:
+            with cache.lock:
+                del cache.inflight[key]
+            event.set()
+
 
+async def _await_memoized(cache: _MemoCache, key: Any, compute: Callable,
+                          ttl: Optional[float]) -> Any:
+    while True:
+        with cache.lock:
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            future = cache.inflight.get(key)
+            owner = future is None
+            if owner:
+                future = asyncio.get_running_loop().create_future()
+                cache.inflight[key] = future
+        if not owner:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                continue
+            except Exception:
+                continue
+        try:
+            value = await compute()
+            with cache.lock:
+                cache.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            if isinstance(e, Exception):
+                future.set_exception(e)
+                # Waiters retry on their own, so nobody has to retrieve it
+                future.exception()
+            else:
+                future.cancel()
+            raise
+        finally:
+            with cache.lock:
+                del cache.inflight[key]
 
-def memoize(fn: Callable) -> Callable:
+
+def _takes_only_self(fn: Callable) -> bool:
+    parameters = list(inspect.signature(fn).parameters.values())
+    return len(parameters) == 1 and parameters[0].kind in (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def memoize(fn: Optional[Callable] = None, *, ttl: Optional[float] = None,
+            maxsize: int = MEMOIZE_MAXSIZE) -> Callable:
     """Decorator to memoize a method.
+
+    A method taking only self becomes a property computed on first access;
+    a method taking arguments keeps up to maxsize results per instance,
+    least recently used evicted first. Concurrent first calls for the same
+    instance and arguments run the method once and share its result, and
+    failures are not cached. With ttl, results are recomputed once older
+    than ttl seconds. `async def` methods are supported: await the
+    property or the call as usual. `del obj.prop` or clear_memoized()
+    drops cached results.
     Example
     -------
     class MyClass:
@@ -63,13 +703,51 @@ def memoize(fn: Callable) -> Callable:
     >>> my_object.a_method
     42
     """
-    attr_name = "_{}".format(fn.__name__)
+    if fn is None:
+        return partial(memoize, ttl=ttl, maxsize=maxsize)
+
+    attr_name = _MEMO_PREFIX + fn.__name__
+    call = _await_memoized if asyncio.iscoroutinefunction(fn) \
+        else _call_memoized
+
+    if _takes_only_self(fn):
+        @wraps(fn)
+        def memoized(self):
+            """"memoized wraps"""
+            cache = _memo_cache(self, attr_name, 1)
+            return call(cache, None, lambda: fn(self), ttl)
+
+        def invalidate(self):
+            """Drop the cached value so the next access recomputes it"""
+            _memo_cache(self, attr_name, 1).clear()
+
+        return property(memoized, None, invalidate)
 
     @wraps(fn)
-    def memoized(self):
+    def memoized_method(self, *args, **kwargs):
         """"memoized wraps"""
-        if not hasattr(self, attr_name):
-            setattr(self, attr_name, fn(self))
-        return getattr(self, attr_name)
+        key = (args, tuple(sorted(kwargs.items()))) if kwargs else args
+        try:
+            hash(key)
+        except TypeError:
+            return fn(self, *args, **kwargs)
+        cache = _memo_cache(self, attr_name, maxsize)
+        return call(cache, key, lambda: fn(self, *args, **kwargs), ttl)
+
+    return memoized_method
+
 
-    return property(memoized)
\ No newline at end of file
+def clear_memoized(instance: Any, name: Optional[str] = None) -> None:
+    """Drop the results memoize cached on instance.
+    Parameters
+    ----------
+    instance: Any
+        Object whose memoized methods or properties to reset
+    name: str
+        Only reset this method; all of them when omitted
+    """
+    for attr_name, state in list(vars(instance).items()):
+        if not isinstance(state, _MemoCache):
+            continue
+        if name is None or attr_name == _MEMO_PREFIX + name:
+            state.clear()
@@ -1,23 +1,118 @@
+import sys
+import queue
 import sqlite3
+import threading
+import timeit
+
+class ConnectionPool:
+    def __init__(self, database, max_size=5):
+        self.database = database
+        self.max_size = max_size
+        self._idle = queue.LifoQueue()  # Most recently used first keeps hot connections hot
+        self._size = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        # Reuse an idle connection, open a new one while under max_size, otherwise wait
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_open = self._size < self.max_size
+            if can_open:
+                self._size += 1
+        if can_open:
+            try:
+                # Connections move between threads with each borrow
+                return sqlite3.connect(self.database, check_same_thread=False)
+            except Exception:
+                with self._lock:
+                    self._size -= 1
+                raise
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No connection to {self.database} free within {timeout}s") from None
+
+    def release(self, connection):
+        # Reset the connection before handing it to the next borrower; a closed pool keeps nothing
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            reusable = not self._closed
+        except sqlite3.Error:
+            reusable = False
+        if not reusable:
+            connection.close()
+            with self._lock:
+                self._size -= 1
+            return
+        self._idle.put(connection)
+
+    def close(self):
+        # Close idle connections; borrowed ones are closed when they come back
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._size -= 1
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(database, max_size=None):
+    # One shared pool per database file, sized by its first caller (5 if None)
+    with _pools_lock:
+        pool = _pools.get(database)
+        if pool is None:
+            pool = _pools[database] = ConnectionPool(database, 5 if max_size is None else max_size)
+        elif max_size is not None and max_size != pool.max_size:
+            raise ValueError(f"Pool for {database} already has max_size={pool.max_size}, not {max_size}")
+        return pool
 
 class DatabaseConnection:
-    def __init__(self, database):
+    def __init__(self, database, pooled=False, pool_size=None, timeout=None):
         self.database = database
+        self.pool = get_pool(database, pool_size) if pooled else None
+        self.timeout = timeout
         self.connection = None
         self.cursor = None
 
     def __enter__(self):
-        # Establish the database connection
-        self.connection = sqlite3.connect(self.database)
+        # Establish the database connection, or borrow a warm one from the pool
+        if self.pool is not None:
+            self.connection = self.pool.acquire(self.timeout)
+        else:
+            self.connection = sqlite3.connect(self.database)
         self.cursor = self.connection.cursor()
         return self.cursor  # Return the cursor to perform queries
 
     def __exit__(self, exc_type, exc_value, traceback):
-        # Close the cursor and connection
+        # Close the cursor and connection (pooled connections are reset and returned)
         if self.cursor:
             self.cursor.close()
         if self.connection:
-            self.connection.close()
+            if self.pool is not None:
+                self.pool.release(self.connection)
+            else:
+                self.connection.close()
+        self.cursor = None
+        self.connection = None
+
+def benchmark(database, iterations=5000):
+    # Compare enter/exit cost of a short query with and without the pool
+    def run(pooled):
+        with DatabaseConnection(database, pooled=pooled) as cursor:
+            cursor.execute("SELECT 1").fetchone()
+
+    for label, pooled in (('fresh connection', False), ('pooled', True)):
+        seconds = timeit.timeit(lambda: run(pooled), number=iterations)
+        print(f"{label:>16}: {seconds / iterations * 1e6:8.2f} us per with-block")
 
 # Example usage of the DatabaseConnection context manager
 if __name__ == "__main__":
@@ -34,4 +129,7 @@ if __name__ == "__main__":
         cursor.execute("SELECT * FROM users")
         results = cursor.fetchall()  # Fetch all results from the query
         for row in results:
-            print(row)  # Print each row from the results
\ No newline at end of file
+            print(row)  # Print each row from the results
+
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark(database)
\ No newline at end of file
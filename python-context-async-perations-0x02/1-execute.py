@@ -1,16 +1,44 @@
 import sqlite3
+from collections import namedtuple
+
+def dict_factory(cursor, row):
+    # Build each row as a {column: value} dict
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def namedtuple_factory():
+    # Returns a row factory that builds the namedtuple class once per result shape
+    cache = {}
+
+    def factory(cursor, row):
+        fields = tuple(column[0] for column in cursor.description)
+        row_class = cache.get(fields)
+        if row_class is None:
+            row_class = cache[fields] = namedtuple('Row', fields, rename=True)
+        return row_class(*row)
+    return factory
+
+ROW_FACTORIES = {
+    'tuple': lambda: None,
+    'namedtuple': namedtuple_factory,
+    'dict': lambda: dict_factory,
+}
 
 class ExecuteQuery:
-    def __init__(self, database, query, params=None):
+    def __init__(self, database, query, params=None, row_factory='tuple', batch_size=500):
+        if row_factory not in ROW_FACTORIES:
+            raise ValueError(f"row_factory must be one of {sorted(ROW_FACTORIES)}")
         self.database = database
         self.query = query
         self.params = params if params is not None else []
+        self.row_factory = row_factory
+        self.batch_size = batch_size
         self.connection = None
         self.cursor = None
 
     def __enter__(self):
         # Establish the database connection
         self.connection = sqlite3.connect(self.database)
+        self.connection.row_factory = ROW_FACTORIES[self.row_factory]()
         self.cursor = self.connection.cursor()
         return self  # Return the context manager itself
 
@@ -19,12 +47,39 @@ class ExecuteQuery:
         self.cursor.execute(self.query, self.params)
         return self.cursor.fetchall()  # Fetch all results from the query
 
+    def batches(self, size=None):
+        # Lazily yield lists of up to `size` rows; only valid inside the with-block
+        if self.cursor is None:
+            raise RuntimeError("ExecuteQuery must be entered before iterating")
+        size = size or self.batch_size
+        cursor = self.connection.execute(self.query, self.params)
+        try:
+            while True:
+                batch = cursor.fetchmany(size)
+                if not batch:
+                    break
+                yield batch
+        finally:
+            # Closing the connection in __exit__ already disposed of the cursor
+            if self.connection is not None:
+                cursor.close()
+
+    def iterate(self):
+        # Lazily yield rows one at a time, fetched batch_size at a time
+        for batch in self.batches():
+            yield from batch
+
+    def __iter__(self):
+        return self.iterate()
+
     def __exit__(self, exc_type, exc_value, traceback):
         # Close the cursor and connection
         if self.cursor:
             self.cursor.close()
         if self.connection:
             self.connection.close()
+        self.cursor = None
+        self.connection = None
 
 # Example usage of the ExecuteQuery context manager
 if __name__ == "__main__":
@@ -1,8 +1,197 @@
 import aiosqlite
 import asyncio
+from pathlib import Path
+from contextlib import asynccontextmanager
 
 DATABASE = 'example.db'  # Replace with your database file
 
+class AsyncConnectionPool:
+    def __init__(self, database=DATABASE, size=4, read_only=False):
+        self.database = database
+        self.size = size
+        self.read_only = read_only
+        self._idle = asyncio.LifoQueue()
+        self._opened = 0
+
+    def _connect(self):
+        if self.read_only:
+            # mode=ro rejects writes at the SQLite level; WAL lets these read alongside the writer
+            return aiosqlite.connect(Path(self.database).resolve().as_uri() + "?mode=ro", uri=True)
+        return aiosqlite.connect(self.database)
+
+    async def acquire(self):
+        # Reuse an idle connection, open one while under size, otherwise wait for a release
+        if self._idle.empty() and self._opened < self.size:
+            self._opened += 1
+            try:
+                return await self._connect()
+            except BaseException:
+                self._opened -= 1
+                raise
+        return await self._idle.get()
+
+    async def release(self, db):
+        if db.in_transaction:
+            await db.rollback()
+        self._idle.put_nowait(db)
+
+    @asynccontextmanager
+    async def connection(self):
+        db = await self.acquire()
+        try:
+            yield db
+        finally:
+            await self.release(db)
+
+    async def close(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+            self._opened -= 1
+
+async def _fetch(db, query, params):
+    async with db.execute(query, params) as cursor:
+        return await cursor.fetchall()
+
+async def _run_query(pool, index, query, params, timeout):
+    # The timeout covers execution only, not the wait for a free connection
+    try:
+        async with pool.connection() as db:
+            try:
+                rows = await asyncio.wait_for(_fetch(db, query, params), timeout)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                # Stop the statement in SQLite too, not just the awaiting task
+                await db.interrupt()
+                raise
+            return index, rows, None
+    except asyncio.TimeoutError as e:
+        return index, None, e
+    except aiosqlite.Error as e:
+        return index, None, e
+
+async def execute_queries(queries, database=DATABASE, concurrency=4, timeout=None, pool=None):
+    # Run many queries over a shared pool of `concurrency` connections and yield
+    # (index, rows, error) tuples in completion order. Each query is a SQL string
+    # or a (sql, params) pair; index is its position in `queries`. Leaving the
+    # loop early cancels whatever is still running.
+    own_pool = pool is None
+    if own_pool:
+        pool = AsyncConnectionPool(database, size=concurrency)
+    tasks = []
+    for index, query in enumerate(queries):
+        sql, params = (query, ()) if isinstance(query, str) else query
+        tasks.append(asyncio.create_task(_run_query(pool, index, sql, params, timeout)))
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if own_pool:
+            await pool.close()
+
+class ReadWriteExecutor:
+    # One dedicated writer connection fed by a queue, plus a pool of read-only
+    # connections, over a WAL database: long reads no longer block writes and
+    # writes no longer wait behind reads. Queued writes are committed in groups,
+    # each in its own savepoint so one failure doesn't undo its neighbours.
+    def __init__(self, database=DATABASE, readers=4, max_pending_writes=1000, max_batch=100):
+        self.database = database
+        self.readers = AsyncConnectionPool(database, size=readers, read_only=True)
+        self.max_batch = max_batch
+        self._writes = asyncio.Queue(maxsize=max_pending_writes)
+        self._writer = None
+        self._writer_task = None
+
+    async def start(self):
+        self._writer = await aiosqlite.connect(self.database)
+        await self._writer.execute("PRAGMA journal_mode = WAL")
+        await self._writer.execute("PRAGMA synchronous = NORMAL")
+        self._writer_task = asyncio.create_task(self._write_loop())
+        return self
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def read(self, query, params=()):
+        async with self.readers.connection() as db:
+            async with db.execute(query, params) as cursor:
+                return await cursor.fetchall()
+
+    async def write(self, query, params=()):
+        # Resolves to the statement's rowcount once its group has committed
+        if self._writer_task is None or self._writer_task.done():
+            raise RuntimeError("ReadWriteExecutor is not running")
+        future = asyncio.get_running_loop().create_future()
+        await self._writes.put((query, params, future))
+        return await future
+
+    async def _write_loop(self):
+        while True:
+            batch = [await self._writes.get()]
+            while len(batch) < self.max_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            try:
+                results = await self._apply(batch)
+            except Exception as e:
+                # The batch as a whole broke; fail its callers but keep serving writes
+                try:
+                    await self._writer.rollback()
+                except Exception:
+                    pass
+                results = [(future, None, e) for _, _, future in batch]
+            for future, rowcount, error in results:
+                if future.done():
+                    continue
+                if error is None:
+                    future.set_result(rowcount)
+                else:
+                    future.set_exception(error)
+            for _ in batch:
+                self._writes.task_done()
+
+    async def _apply(self, batch):
+        # One transaction for the batch, one savepoint per queued write
+        if not self._writer.in_transaction:
+            await self._writer.execute("BEGIN")
+        results = []
+        for query, params, future in batch:
+            await self._writer.execute("SAVEPOINT queued_write")
+            try:
+                cursor = await self._writer.execute(query, params)
+            except Exception as e:
+                await self._writer.execute("ROLLBACK TO queued_write")
+                results.append((future, None, e))
+            else:
+                results.append((future, cursor.rowcount, None))
+            await self._writer.execute("RELEASE queued_write")
+        await self._writer.commit()
+        return results
+
+    def _fail_queued(self, error):
+        while not self._writes.empty():
+            _, _, future = self._writes.get_nowait()
+            if not future.done():
+                future.set_exception(error)
+            self._writes.task_done()
+
+    async def close(self):
+        # Let queued writes finish, then shut everything down
+        if self._writer_task is not None:
+            drained = asyncio.ensure_future(self._writes.join())
+            # If the writer task ended anyway, don't wait on writes nobody will apply
+            await asyncio.wait({drained, self._writer_task}, return_when=asyncio.FIRST_COMPLETED)
+            drained.cancel()
+            self._writer_task.cancel()
+            await asyncio.gather(self._writer_task, return_exceptions=True)
+            self._fail_queued(RuntimeError("ReadWriteExecutor closed before the write ran"))
+            await self._writer.close()
+            self._writer_task = None
+        await self.readers.close()
+
 async def async_fetch_users():
     async with aiosqlite.connect(DATABASE) as db:
         async with db.execute("SELECT * FROM users") as cursor:
@@ -1,14 +1,38 @@
+import time
 import sqlite3
 import functools
-from datetime import datetime
+import query_log
+
+def log_queries(func=None, *, sample_rate=1.0, slow_ms=100.0):
+    """Decorator to log SQL queries as structured events.
+
+    Each event records the query text, the types of its bound parameters,
+    latency in nanoseconds, the number of rows returned and the calling
+    line. Unless the application handles the 'queries' logger itself,
+    events are handed to a background thread through a queue (see
+    query_log.configure), so the hot path never formats or writes output.
+    Only sample_rate of calls are logged, but queries slower than slow_ms
+    are always logged, at WARNING level.
+    """
+    if func is None:
+        return functools.partial(log_queries, sample_rate=sample_rate, slow_ms=slow_ms)
+    slow_ns = slow_ms * 1_000_000
 
-def log_queries(func):
-    """Decorator to log SQL queries with a timestamp."""
     @functools.wraps(func)
     def wrapper(query, *args, **kwargs):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"[{timestamp}] Executing query: {query}")  # Log the query with timestamp
-        return func(query, *args, **kwargs)  # Call the original function
+        caller = query_log.caller_of()
+        start = time.perf_counter_ns()
+        error = None
+        result = None
+        try:
+            result = func(query, *args, **kwargs)  # Call the original function
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            query_log.record(query, args, kwargs, result, error,
+                             time.perf_counter_ns() - start, caller, sample_rate, slow_ns)
     return wrapper
 
 @log_queries
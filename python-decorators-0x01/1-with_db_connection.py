@@ -1,12 +1,17 @@
+import time
 import sqlite3
 import functools
+from connection_pool import execute, get_pool, with_pooled_connection
+from profiling import registry
 
 def with_db_connection(func):
     """Decorator to handle database connections."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Open database connection
+        start = time.perf_counter_ns()
         conn = sqlite3.connect('users.db')
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
         try:
             # Pass the connection to the original function
             return func(conn, *args, **kwargs)
@@ -15,14 +20,14 @@ def with_db_connection(func):
             conn.close()
     return wrapper
 
-@with_db_connection
+# Called on hot paths, so it reuses a pooled connection instead of opening one per call
+@with_pooled_connection
 def get_user_by_id(conn, user_id):
     """Fetch a user by ID from the database."""
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    return cursor.fetchone()
+    return execute(conn, "SELECT * FROM users WHERE id = ?", (user_id,)).fetchone()
 
 # Example usage: Fetch user by ID with automatic connection handling
 if __name__ == "__main__":
     user = get_user_by_id(user_id=1)
-    print(user)
\ No newline at end of file
+    print(user)
+    print(get_pool('users.db').stats())
\ No newline at end of file
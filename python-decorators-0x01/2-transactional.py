@@ -1,12 +1,151 @@
+import time
+import atexit
 import sqlite3
 import functools
+import threading
+from cache import database_identity, invalidate_tables, record_writes, table_written
+from connection_pool import execute, hold_transaction, let_go_transaction, with_pooled_connection
+from profiling import registry
+
+# Nesting depth of transactional calls per connection (keyed by id, since
+# sqlite3 connections take neither attributes nor weak references)
+_depths = {}
+
+def _run_in_savepoint(conn, depth, func, args, kwargs):
+    """Runs func inside SAVEPOINT so a failure only undoes its own work."""
+    name = f"transactional_{depth}"
+    conn.execute(f"SAVEPOINT {name}")
+    _depths[id(conn)] = depth + 1
+    try:
+        result = func(conn, *args, **kwargs)
+    except Exception:
+        conn.execute(f"ROLLBACK TO {name}")
+        conn.execute(f"RELEASE {name}")
+        raise
+    else:
+        conn.execute(f"RELEASE {name}")
+    finally:
+        if depth:
+            _depths[id(conn)] = depth
+        else:
+            _depths.pop(id(conn), None)
+    return result
+
+class GroupCommitError(Exception):
+    """A group commit failed; every write in the batch was rolled back."""
+
+# id(conn) -> the _Batch holding conn's open group transaction
+_batches = {}
+
+class _Batch:
+    """One connection's shared transaction in a GroupCommit."""
+    def __init__(self, conn, deadline):
+        self.conn = conn
+        self.deadline = deadline
+        self.calls = 0
+        self.written = set()
+
+class GroupCommit:
+    """Coalesces the commits of many small transactional calls into one.
+
+    Each call runs in its own savepoint inside a shared transaction. The
+    batch is committed by the call that makes it max_calls long or that
+    finds it open longer than max_delay, by flush(), or on leaving a
+    `with group_commit:` block. Everything happens on the connection's own
+    thread, so an idle batch keeps SQLite's write lock until one of those;
+    wrap bursts in `with` to bound it. A write is only durable once its
+    batch is committed: if the commit fails the whole batch is rolled back
+    and GroupCommitError is raised to whoever triggered it, even though the
+    earlier calls already returned. Plain @transactional calls on a
+    connection with an open batch join it as a savepoint. Pending work
+    survives between calls only on a persistent connection, so use it with
+    with_pooled_connection rather than with_db_connection, and flush before
+    a worker thread exits: its pooled connection is closed with the thread.
+    """
+    def __init__(self, max_calls=100, max_delay=0.05):
+        self.max_calls = max_calls
+        self.max_delay = max_delay
+        self._local = threading.local()  # this thread's open batches, by id(conn)
+        atexit.register(self.flush)
+
+    def _open_batches(self):
+        batches = getattr(self._local, 'batches', None)
+        if batches is None:
+            batches = self._local.batches = {}
+        return batches
+
+    def _start(self, conn):
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        batch = _Batch(conn, time.monotonic() + self.max_delay)
+
+        def trace(statement):
+            table = table_written(statement)
+            if table is not None:
+                batch.written.add(table)
+
+        conn.set_trace_callback(trace)
+        hold_transaction(conn)
+        self._open_batches()[id(conn)] = batch
+        _batches[id(conn)] = batch
+        return batch
+
+    def run(self, conn, func, args, kwargs):
+        batch = self._open_batches().get(id(conn))
+        if batch is None and id(conn) in _batches:
+            # Another GroupCommit's batch is open here: join it
+            return _run_in_savepoint(conn, 0, func, args, kwargs)
+        if batch is not None and time.monotonic() >= batch.deadline:
+            self.flush(conn)
+            batch = None
+        if batch is None:
+            batch = self._start(conn)
+        result = _run_in_savepoint(conn, 0, func, args, kwargs)
+        batch.calls += 1
+        if batch.calls >= self.max_calls or time.monotonic() >= batch.deadline:
+            self.flush(conn)
+        return result
+
+    def flush(self, conn=None):
+        """Commits this thread's pending transaction on conn, or all of them if None."""
+        batches = self._open_batches()
+        if conn is None:
+            pending = list(batches.values())
+            batches.clear()
+        else:
+            batch = batches.pop(id(conn), None)
+            pending = [batch] if batch else []
+        for batch in pending:
+            self._commit(batch)
+
+    def _commit(self, batch):
+        conn = batch.conn
+        _batches.pop(id(conn), None)
+        conn.set_trace_callback(None)
+        let_go_transaction(conn)
+        try:
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            print(f"Group commit of {batch.calls} calls failed: {e}")
+            raise GroupCommitError(f"Group commit of {batch.calls} calls failed") from e
+        if batch.written:
+            invalidate_tables(database_identity(conn), batch.written)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.flush()
 
 def with_db_connection(func):
     """Decorator to handle database connections."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Open database connection
+        start = time.perf_counter_ns()
         conn = sqlite3.connect('users.db')
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
         try:
             # Pass the connection to the original function
             return func(conn, *args, **kwargs)
@@ -15,23 +154,56 @@ def with_db_connection(func):
             conn.close()
     return wrapper
 
-def transactional(func):
-    """Decorator to manage database transactions."""
+def transactional(func=None, *, group_commit=None):
+    """Decorator to manage database transactions.
+
+    The outermost decorated call on a connection commits or rolls back.
+    Nested decorated calls run in SAVEPOINTs: an inner failure undoes only
+    the inner call's work and re-raises, leaving the outer call to decide.
+    With group_commit=GroupCommit(...) the commits of consecutive calls are
+    batched into one; a plain call on a connection with an open batch joins
+    that batch. After a commit, cached query results that read from
+    any table written in the transaction are invalidated.
+    """
+    if func is None:
+        return functools.partial(transactional, group_commit=group_commit)
+
     @functools.wraps(func)
     def wrapper(conn, *args, **kwargs):
-        try:
-            # Execute the original function
-            result = func(conn, *args, **kwargs)
-            # Commit the transaction if no exceptions were raised
-            conn.commit()
-            return result
-        except Exception as e:
-            # Rollback the transaction in case of error
-            conn.rollback()
-            print(f"Transaction failed: {e}")
-            raise  # Re-raise the exception for further handling
+        depth = _depths.get(id(conn), 0)
+        if depth:
+            return _run_in_savepoint(conn, depth, func, args, kwargs)
+        if group_commit is not None:
+            return group_commit.run(conn, func, args, kwargs)
+        if id(conn) in _batches:
+            # A group transaction is open: commit with it rather than ending it early
+            return _run_in_savepoint(conn, 0, func, args, kwargs)
+
+        with record_writes(conn) as written:
+            _depths[id(conn)] = 1
+            try:
+                if not conn.in_transaction:
+                    # Explicit BEGIN so a nested SAVEPOINT can't become the outer transaction
+                    conn.execute("BEGIN")
+                # Execute the original function
+                result = func(conn, *args, **kwargs)
+                # Commit the transaction if no exceptions were raised
+                conn.commit()
+            except Exception as e:
+                # Rollback the transaction in case of error
+                conn.rollback()
+                print(f"Transaction failed: {e}")
+                raise  # Re-raise the exception for further handling
+            finally:
+                _depths.pop(id(conn), None)
+        if written:
+            invalidate_tables(database_identity(conn), written)
+        return result
     return wrapper
 
+# Shared window for the bulk email updates below
+email_updates = GroupCommit(max_calls=500, max_delay=0.1)
+
 @with_db_connection
 @transactional
 def update_user_email(conn, user_id, new_email):
@@ -39,6 +211,12 @@ def update_user_email(conn, user_id, new_email):
     cursor = conn.cursor()
     cursor.execute("UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
 
+@with_pooled_connection
+@transactional(group_commit=email_updates)
+def bulk_update_user_email(conn, user_id, new_email):
+    """Update user's email, sharing one commit with neighbouring calls."""
+    execute(conn, "UPDATE users SET email = ? WHERE id = ?", (new_email, user_id))
+
 # Example usage: Update email for user with ID 1
 if __name__ == "__main__":
     try:
@@ -1,13 +1,19 @@
 import time
+import asyncio
+import inspect
 import sqlite3
 import functools
+from profiling import registry
+from retry import RetryPolicy, default_breaker, default_budget, is_transient
 
 def with_db_connection(func):
     """Decorator to handle database connections."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Open database connection
+        start = time.perf_counter_ns()
         conn = sqlite3.connect('users.db')
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
         try:
             # Pass the connection to the original function
             return func(conn, *args, **kwargs)
@@ -16,21 +22,58 @@ def with_db_connection(func):
             conn.close()
     return wrapper
 
-def retry_on_failure(retries=3, delay=2):
-    """Decorator to retry a function if it raises an exception."""
+def retry_on_failure(retries=3, delay=2, max_delay=30, retry_on=is_transient,
+                     budget=default_budget, breaker=default_breaker):
+    """Decorator to retry a function when it raises a transient error.
+
+    Waits use exponential backoff with full jitter, starting from delay and
+    capped at max_delay. retry_on is either a predicate on the exception or an
+    exception class/tuple; anything else is re-raised immediately. Retries are
+    drawn from a process-wide RetryBudget, and a shared CircuitBreaker fails
+    calls fast with CircuitOpenError during an outage. Pass budget=None or
+    breaker=None to opt out. async def functions are retried with asyncio.sleep.
+    """
     def decorator(func):
+        policy = RetryPolicy(func.__name__, retries, delay, max_delay, retry_on,
+                             budget, breaker)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                for attempt in range(retries):
+                    admission = policy.before_attempt()
+                    try:
+                        result = await func(*args, **kwargs)
+                    except Exception as e:
+                        wait = policy.next_delay(attempt, e)
+                        if wait is None:
+                            raise
+                        await asyncio.sleep(wait)  # Yield to the event loop while waiting
+                    except BaseException:
+                        policy.abandoned(admission)
+                        raise
+                    else:
+                        policy.succeeded()
+                        return result
+            return async_wrapper
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             for attempt in range(retries):
+                admission = policy.before_attempt()
                 try:
-                    return func(*args, **kwargs)  # Attempt to call the function
+                    result = func(*args, **kwargs)  # Attempt to call the function
                 except Exception as e:
-                    if attempt < retries - 1:  # Check if there are retries left
-                        print(f"Attempt {attempt + 1} failed: {e}. Retrying in {delay} seconds...")
-                        time.sleep(delay)  # Wait before retrying
-                    else:
-                        print("All attempts failed.")
+                    wait = policy.next_delay(attempt, e)
+                    if wait is None:
                         raise  # Re-raise the last exception
+                    time.sleep(wait)  # Wait before retrying
+                except BaseException:
+                    policy.abandoned(admission)
+                    raise
+                else:
+                    policy.succeeded()
+                    return result
         return wrapper
     return decorator
 
@@ -1,15 +1,25 @@
+import os
+import time
 import sqlite3
 import functools
+from cache import QueryCache, SQLiteCacheBackend, make_key, tables_read
+from profiling import registry
 
-# Cache dictionary to store query results
-query_cache = {}
+# Shared cache for query results: bounded, TTL-aware and invalidated on commit.
+# Set QUERY_CACHE_PATH to share one cache file between worker processes.
+if os.getenv('QUERY_CACHE_PATH'):
+    query_cache = SQLiteCacheBackend(os.environ['QUERY_CACHE_PATH'])
+else:
+    query_cache = QueryCache()
 
 def with_db_connection(func):
     """Decorator to handle database connections."""
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
         # Open database connection
+        start = time.perf_counter_ns()
         conn = sqlite3.connect('users.db')
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
         try:
             # Pass the connection to the original function
             return func(conn, *args, **kwargs)
@@ -18,18 +28,44 @@ def with_db_connection(func):
             conn.close()
     return wrapper
 
-def cache_query(func):
-    """Decorator to cache query results based on the SQL query string."""
+def cache_query(func=None, *, ttl=None, cache=None):
+    """Decorator to cache query results keyed on the database, SQL string and parameters.
+
+    Usable bare (@cache_query) or configured (@cache_query(ttl=60, cache=my_cache)).
+    Entries expire after ttl seconds (the cache's default_ttl if None, never
+    cached if 0) and are dropped when a transactional write commits to a table they read from.
+    """
+    if func is None:
+        return functools.partial(cache_query, ttl=ttl, cache=cache)
+
     @functools.wraps(func)
     def wrapper(conn, query, *args, **kwargs):
-        if query in query_cache:
+        store = query_cache if cache is None else cache
+        key = make_key(conn, query, args, kwargs)
+        if key is None:
+            # Unhashable parameters: run the query uncached
+            return func(conn, query, *args, **kwargs)
+
+        hit, result = store.get(key)
+        if hit:
+            registry.record_cache(query, True)
             print("Fetching from cache...")
-            return query_cache[query]  # Return cached result
+            return result  # Return cached result
+
+        # Only one caller per key runs the query; the others wait and re-check
+        with store.single_flight(key):
+            hit, result = store.get(key)
+            registry.record_cache(query, hit)
+            if hit:
+                print("Fetching from cache...")
+                return result
 
-        # Call the original function and cache the result
-        result = func(conn, query, *args, **kwargs)
-        query_cache[query] = result  # Store result in cache
-        return result
+            # Call the original function and cache the result
+            tables = tables_read(query)
+            generation = store.generation(key[0], tables)
+            result = func(conn, query, *args, **kwargs)
+            store.set(key, result, tables, ttl=ttl, generation=generation)
+            return result
     return wrapper
 
 @with_db_connection
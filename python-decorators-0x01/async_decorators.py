@@ -0,0 +1,299 @@
+import time
+import asyncio
+import weakref
+import functools
+import contextvars
+import aiosqlite
+import query_log
+from cache import QueryCache, invalidate_tables, make_key, table_written, tables_read
+from connection_pool import DEFAULT_PRAGMAS
+from profiling import registry
+from retry import RetryPolicy, default_breaker, default_budget, is_transient
+
+# The connection the current task already holds, so nested decorated calls share it
+_current = contextvars.ContextVar('current_connection', default=None)
+
+# Nesting depth of transactional calls per connection
+_depths = {}
+
+class AsyncConnectionPool:
+    """Bounded pool of aiosqlite connections to one database file.
+
+    PRAGMAs are applied once when a connection is opened. acquire() waits
+    without blocking the event loop when all max_size connections are in use.
+    """
+    def __init__(self, database='users.db', max_size=8, pragmas=DEFAULT_PRAGMAS):
+        self.database = database
+        self.max_size = max_size
+        self.pragmas = pragmas
+        self._idle = asyncio.LifoQueue()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+
+    async def _open(self):
+        conn = await aiosqlite.connect(self.database)
+        for name, value in self.pragmas:
+            await conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    async def acquire(self):
+        if self._idle.empty() and self._size < self.max_size:
+            self._size += 1
+            self._misses += 1
+            try:
+                return await self._open()
+            except BaseException:
+                self._size -= 1
+                raise
+        self._hits += 1
+        return await self._idle.get()
+
+    async def release(self, conn):
+        if conn.in_transaction:
+            # Same as closing a fresh connection: uncommitted work is discarded
+            await conn.rollback()
+        self._idle.put_nowait(conn)
+
+    def stats(self):
+        total = self._hits + self._misses
+        return {'hits': self._hits, 'misses': self._misses,
+                'hit_ratio': self._hits / total if total else 0.0,
+                'connections': self._size, 'idle': self._idle.qsize()}
+
+    async def close(self):
+        while not self._idle.empty():
+            await self._idle.get_nowait().close()
+            self._size -= 1
+
+# event loop -> {database: pool}; a pool's queue only works on the loop it was made on
+_pools = weakref.WeakKeyDictionary()
+
+def get_pool(database='users.db'):
+    """Returns the running loop's shared pool for a database file, creating it on first use."""
+    pools = _pools.setdefault(asyncio.get_running_loop(), {})
+    if database not in pools:
+        pools[database] = AsyncConnectionPool(database)
+    return pools[database]
+
+async def close_pools():
+    """Closes the running loop's pooled connections; aiosqlite threads keep the process alive until then."""
+    pools = _pools.pop(asyncio.get_running_loop(), {})
+    for pool in pools.values():
+        await pool.close()
+
+def with_db_connection(func=None, *, database='users.db'):
+    """Async decorator that passes a pooled aiosqlite connection as the first argument."""
+    if func is None:
+        return functools.partial(with_db_connection, database=database)
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        held = _current.get()
+        if held is not None and held[0] == database:
+            return await func(held[1], *args, **kwargs)
+        pool = get_pool(database)
+        start = time.perf_counter_ns()
+        conn = await pool.acquire()
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
+        token = _current.set((database, conn))
+        try:
+            return await func(conn, *args, **kwargs)
+        finally:
+            _current.reset(token)
+            await pool.release(conn)
+    return wrapper
+
+# aiosqlite connection -> its database identity, looked up once per connection
+_identities = weakref.WeakKeyDictionary()
+
+async def _database_identity(conn):
+    identity = _identities.get(conn)
+    if identity is None:
+        identity = f":unknown:{id(conn)}"
+        async with conn.execute("PRAGMA database_list") as cursor:
+            for _, name, path in await cursor.fetchall():
+                if name == 'main':
+                    identity = path or f":memory:{id(conn)}"
+                    break
+        _identities[conn] = identity
+    return identity
+
+async def _run_in_savepoint(conn, depth, func, args, kwargs):
+    name = f"transactional_{depth}"
+    await conn.execute(f"SAVEPOINT {name}")
+    _depths[id(conn)] = depth + 1
+    try:
+        result = await func(conn, *args, **kwargs)
+    except Exception:
+        await conn.execute(f"ROLLBACK TO {name}")
+        await conn.execute(f"RELEASE {name}")
+        raise
+    else:
+        await conn.execute(f"RELEASE {name}")
+    finally:
+        _depths[id(conn)] = depth
+    return result
+
+def transactional(func):
+    """Async decorator to manage transactions, with SAVEPOINTs for nested calls.
+
+    Mirrors transactional in 2-transactional.py: the outermost call commits
+    or rolls back, and committed writes invalidate cached query results.
+    """
+    @functools.wraps(func)
+    async def wrapper(conn, *args, **kwargs):
+        depth = _depths.get(id(conn), 0)
+        if depth:
+            return await _run_in_savepoint(conn, depth, func, args, kwargs)
+
+        written = set()
+
+        def trace(statement):
+            table = table_written(statement)
+            if table is not None:
+                written.add(table)
+
+        await conn.set_trace_callback(trace)
+        _depths[id(conn)] = 1
+        try:
+            if not conn.in_transaction:
+                await conn.execute("BEGIN")
+            result = await func(conn, *args, **kwargs)
+            await conn.commit()
+        except Exception as e:
+            await conn.rollback()
+            print(f"Transaction failed: {e}")
+            raise
+        finally:
+            _depths.pop(id(conn), None)
+            await conn.set_trace_callback(None)
+        if written:
+            invalidate_tables(await _database_identity(conn), written)
+        return result
+    return wrapper
+
+def retry_on_failure(retries=3, delay=2, max_delay=30, retry_on=is_transient,
+                     budget=default_budget, breaker=default_breaker):
+    """Async decorator to retry transient failures with jittered exponential backoff.
+
+    Same RetryPolicy as retry_on_failure in 3-retry_on_failure.py, sharing its
+    process-wide retry budget and circuit breaker; waits use asyncio.sleep.
+    """
+    def decorator(func):
+        policy = RetryPolicy(func.__name__, retries, delay, max_delay, retry_on,
+                             budget, breaker)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(retries):
+                admission = policy.before_attempt()
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    wait = policy.next_delay(attempt, e)
+                    if wait is None:
+                        raise
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    policy.abandoned(admission)
+                    raise
+                else:
+                    policy.succeeded()
+                    return result
+        return wrapper
+    return decorator
+
+# Results cached by the async cache_query; invalidated together with the sync caches
+query_cache = QueryCache()
+
+# Cache key -> future of the query currently fetching it, for single-flight
+_inflight = {}
+
+def cache_query(func=None, *, ttl=None, cache=None):
+    """Async decorator to cache query results keyed on the database, SQL and parameters.
+
+    Concurrent misses on the same key share one execution: the first task
+    runs the query and the others await its result (or its exception).
+    Stores other than the in-memory QueryCache are accessed in a worker
+    thread so disk I/O never blocks the event loop.
+    """
+    if func is None:
+        return functools.partial(cache_query, ttl=ttl, cache=cache)
+
+    @functools.wraps(func)
+    async def wrapper(conn, query, *args, **kwargs):
+        store = query_cache if cache is None else cache
+        in_memory = isinstance(store, QueryCache)
+        key = make_key(None, query, args, kwargs, database=await _database_identity(conn))
+        if key is None:
+            return await func(conn, query, *args, **kwargs)
+
+        while True:
+            hit, result = store.get(key) if in_memory else await asyncio.to_thread(store.get, key)
+            if hit:
+                registry.record_cache(query, True)
+                return result
+            pending = _inflight.get(key)
+            if pending is None:
+                break
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # Only the task running the query was cancelled: take over from it
+        registry.record_cache(query, False)
+
+        pending = _inflight[key] = asyncio.get_running_loop().create_future()
+        try:
+            tables = tables_read(query)
+            if in_memory:
+                generation = store.generation(key[0], tables)
+            else:
+                generation = await asyncio.to_thread(store.generation, key[0], tables)
+            result = await func(conn, query, *args, **kwargs)
+            if in_memory:
+                store.set(key, result, tables, ttl=ttl, generation=generation)
+            else:
+                await asyncio.to_thread(store.set, key, result, tables, ttl, generation)
+            pending.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            pending.cancel()
+            raise
+        except Exception as e:
+            pending.set_exception(e)
+            # Mark it retrieved so an unawaited failure doesn't warn at shutdown
+            pending.exception()
+            raise
+        except BaseException:
+            # KeyboardInterrupt, SystemExit...: waiters take over as with a cancellation
+            pending.cancel()
+            raise
+        finally:
+            del _inflight[key]
+    return wrapper
+
+def log_queries(func=None, *, sample_rate=1.0, slow_ms=100.0):
+    """Async decorator emitting the same structured query events as log_queries."""
+    if func is None:
+        return functools.partial(log_queries, sample_rate=sample_rate, slow_ms=slow_ms)
+    slow_ns = slow_ms * 1_000_000
+
+    @functools.wraps(func)
+    async def wrapper(query, *args, **kwargs):
+        caller = query_log.caller_of()
+        start = time.perf_counter_ns()
+        error = None
+        result = None
+        try:
+            result = await func(query, *args, **kwargs)
+            return result
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            query_log.record(query, args, kwargs, result, error,
+                             time.perf_counter_ns() - start, caller, sample_rate, slow_ns)
+    return wrapper
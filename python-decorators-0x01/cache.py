@@ -0,0 +1,485 @@
+import re
+import sys
+import time
+import zlib
+import pickle
+import sqlite3
+import hashlib
+import weakref
+import datetime
+import threading
+from decimal import Decimal
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-flight is then per-process only
+    fcntl = None
+
+# Good enough for the SELECT/INSERT/UPDATE/DELETE statements these decorators run;
+# writes made by triggers or foreign-key cascades are not seen.
+READ_TABLES = re.compile(r'\b(?:FROM|JOIN)\s+["`\[]?(\w+)', re.IGNORECASE)
+WRITE_TABLE = re.compile(
+    r'^\s*(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)'
+    r'\s+["`\[]?(\w+)',
+    re.IGNORECASE,
+)
+
+# Every live cache, so a commit can invalidate all of them at once
+_caches = weakref.WeakSet()
+
+# Results at least this big are zlib-compressed in shared backends
+COMPRESS_THRESHOLD = 1024
+
+# Parameter types with a stable repr(), so keys hash the same in every process
+KEY_SCALARS = (type(None), bool, int, float, str, bytes, Decimal,
+               datetime.date, datetime.time, datetime.timedelta)
+
+def tables_read(query):
+    """Returns the lower-cased table names a SELECT reads from."""
+    return frozenset(name.lower() for name in READ_TABLES.findall(query))
+
+def table_written(query):
+    """Returns the lower-cased table an INSERT/UPDATE/DELETE writes to, or None."""
+    match = WRITE_TABLE.match(query)
+    return match.group(1).lower() if match else None
+
+# id(conn) -> (conn, identity) for recently used connections. The entry keeps
+# its connection alive, so the id can't be reused by another database while
+# cached; the oldest entries are dropped past IDENTITY_CACHE_SIZE.
+_identities = OrderedDict()
+_identities_lock = threading.Lock()
+IDENTITY_CACHE_SIZE = 64
+
+def database_identity(conn):
+    """Identifies the database behind a sqlite3 connection by its main file path."""
+    with _identities_lock:
+        cached = _identities.get(id(conn))
+        if cached is not None and cached[0] is conn:
+            _identities.move_to_end(id(conn))
+            return cached[1]
+    identity = f":unknown:{id(conn)}"
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == 'main':
+            # In-memory databases are private to their connection
+            identity = path or f":memory:{id(conn)}"
+            break
+    with _identities_lock:
+        _identities[id(conn)] = (conn, identity)
+        _identities.move_to_end(id(conn))
+        while len(_identities) > IDENTITY_CACHE_SIZE:
+            _identities.popitem(last=False)
+    return identity
+
+def make_key(conn, query, args=(), kwargs=None, database=None):
+    """Builds a cache key from the database, SQL text and bound parameters.
+
+    database overrides looking up conn's identity (conn may then be None).
+    Returns None for parameters outside KEY_SCALARS and containers of them
+    (objects with a default repr, say), meaning "don't cache": they couldn't
+    produce the same key twice.
+    """
+    def freeze(value):
+        if isinstance(value, (list, tuple)):
+            return tuple(freeze(item) for item in value)
+        if isinstance(value, dict):
+            return tuple(sorted((str(k), freeze(v)) for k, v in value.items()))
+        if isinstance(value, (set, frozenset)):
+            # Sorted by repr so the order doesn't depend on the hash seed
+            return ('<set>',) + tuple(sorted((freeze(item) for item in value), key=repr))
+        if isinstance(value, KEY_SCALARS):
+            return value
+        raise TypeError(f"Can't build a cache key from {type(value).__name__}")
+
+    try:
+        frozen = (freeze(args), freeze(kwargs or {}))
+    except TypeError:
+        return None
+    if database is None:
+        database = database_identity(conn)
+    return (database, query) + frozen
+
+def _size_of(value):
+    try:
+        return len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+class _KeyedFlights:
+    """Per-key locks, created on demand and dropped once nobody holds or waits on them.
+
+    Unlike a fixed set of striped locks, unrelated keys never share a lock, so a
+    cached call that makes another cached call can't deadlock on itself.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> [lock, holders and waiters]
+
+    @contextmanager
+    def hold(self, key):
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = [threading.Lock(), 0]
+            flight[1] += 1
+        try:
+            with flight[0]:
+                yield
+        finally:
+            with self._lock:
+                flight[1] -= 1
+                if not flight[1]:
+                    del self._flights[key]
+
+class _Entry:
+    __slots__ = ('value', 'size', 'expires', 'hits', 'tables')
+
+    def __init__(self, value, size, expires, tables):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.hits = 0
+        self.tables = tables
+
+class QueryCache:
+    """Thread-safe query result cache with a byte budget, TTLs and table invalidation.
+
+    Entries are evicted least-recently-used first (policy='lru') or
+    least-frequently-used first (policy='lfu') once max_bytes is exceeded.
+    Sizes are measured as the pickled size of the result. A ttl of 0 means
+    "don't cache"; default_ttl=None keeps entries until evicted or invalidated.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024, default_ttl=300.0, policy='lru'):
+        if policy not in ('lru', 'lfu'):
+            raise ValueError("policy must be 'lru' or 'lfu'")
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.policy = policy
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._by_table = {}      # (database, table) -> set of keys
+        self._generations = {}   # (database, table) -> bumped on every invalidation
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0,
+                       'invalidations': 0}
+        self._flights = _KeyedFlights()
+        _caches.add(self)
+
+    def single_flight(self, key):
+        """Serializes threads missing on the same key so only one runs the query."""
+        return self._flights.hold(key)
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for table in entry.tables:
+            keys = self._by_table.get((key[0], table))
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[(key[0], table)]
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit, else (False, None)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            if entry.expires is not None and entry.expires <= time.monotonic():
+                self._drop(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, entry.value
+
+    def generation(self, database, tables):
+        """Snapshot of the invalidation counters for tables, to pass back to set().
+
+        Keyed by table, so the comparison in set() doesn't depend on the
+        order the tables are listed in.
+        """
+        with self._lock:
+            return {table: self._generations.get((database, table), 0) for table in tables}
+
+    def set(self, key, value, tables, ttl=None, generation=None):
+        """Stores a result read from tables.
+
+        If generation (from generation()) is given and any of the tables was
+        invalidated since, the result may already be stale and is not stored.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return  # ttl=0: don't cache
+        size = _size_of(value)
+        if size > self.max_bytes:
+            return
+        database = key[0]
+        tables = frozenset(tables)
+        with self._lock:
+            if generation is not None:
+                current = {table: self._generations.get((database, table), 0)
+                           for table in tables}
+                if current != generation:
+                    return
+            if key in self._entries:
+                self._drop(key)
+            expires = time.monotonic() + ttl if ttl is not None else None
+            self._entries[key] = _Entry(value, size, expires, tables)
+            self._bytes += size
+            for table in tables:
+                self._by_table.setdefault((database, table), set()).add(key)
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._entries:
+            if self.policy == 'lru':
+                victim = next(iter(self._entries))
+            else:
+                victim = min(self._entries, key=lambda k: self._entries[k].hits)
+            self._drop(victim)
+            self._stats['evictions'] += 1
+
+    def invalidate_tables(self, database, tables):
+        """Drops every entry for database that read any of tables."""
+        with self._lock:
+            for table in tables:
+                table = table.lower()
+                self._generations[(database, table)] = self._generations.get((database, table), 0) + 1
+                for key in list(self._by_table.get((database, table), ())):
+                    self._drop(key)
+                    self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Empties the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._by_table.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and current usage."""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot.update(entries=len(self._entries), bytes=self._bytes,
+                            max_bytes=self.max_bytes)
+        return snapshot
+
+def dumps(value):
+    """Serializes a result compactly: pickle, zlib-compressed when large."""
+    data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    if len(data) >= COMPRESS_THRESHOLD:
+        return b'z' + zlib.compress(data, 1)
+    return b'p' + data
+
+def loads(blob):
+    """Inverse of dumps()."""
+    blob = bytes(blob)
+    data = zlib.decompress(blob[1:]) if blob[:1] == b'z' else blob[1:]
+    return pickle.loads(data)
+
+class SQLiteCacheBackend:
+    """Query cache stored in a local SQLite file shared by every process that opens it.
+
+    Drop-in replacement for QueryCache: workers on the same host share one
+    warm copy of each result instead of one per process. single_flight()
+    takes a byte-range lock on a sidecar lock file, so when N processes miss
+    on the same query only one of them runs it. Eviction is approximately
+    LRU against max_bytes of serialized data.
+    """
+    LOCK_SLOTS = 1024
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024, default_ttl=300.0):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._flights = _KeyedFlights()
+        self._slot_lock = threading.Lock()
+        self._slot_holders = {}  # lock-file slot -> threads of this process using it
+        self._lock_file = open(path + '.lock', 'a+b') if fcntl else None
+        self._stats = {'hits': 0, 'misses': 0}
+        with self._conn() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key BLOB PRIMARY KEY, value BLOB, size INTEGER,
+                    expires REAL, last_used REAL);
+                CREATE TABLE IF NOT EXISTS entry_tables (
+                    db TEXT, tbl TEXT, key BLOB, PRIMARY KEY (db, tbl, key)) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS generations (
+                    db TEXT, tbl TEXT, generation INTEGER, PRIMARY KEY (db, tbl)) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+            """)
+        _caches.add(self)
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA mmap_size = 268435456")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _digest(key):
+        return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+    @contextmanager
+    def single_flight(self, key):
+        """Holds key's in-process lock and a cross-process lock on its slot.
+
+        fcntl locks belong to the process, not the thread, so the slot is
+        locked by the first thread of this process to need it and unlocked
+        by the last; only other processes ever wait on it.
+        """
+        with self._flights.hold(key):
+            if self._lock_file is None:
+                yield
+                return
+            slot = int.from_bytes(self._digest(key)[:4], 'big') % self.LOCK_SLOTS
+            with self._slot_lock:
+                holders = self._slot_holders.get(slot, 0)
+                self._slot_holders[slot] = holders + 1
+            try:
+                if not holders:
+                    fcntl.lockf(self._lock_file, fcntl.LOCK_EX, 1, slot)
+                yield
+            finally:
+                with self._slot_lock:
+                    self._slot_holders[slot] -= 1
+                    last = not self._slot_holders[slot]
+                    if last:
+                        del self._slot_holders[slot]
+                if last:
+                    fcntl.lockf(self._lock_file, fcntl.LOCK_UN, 1, slot)
+
+    def get(self, key):
+        """Returns (True, value) on a fresh hit, else (False, None)."""
+        digest = self._digest(key)
+        now = time.time()
+        conn = self._conn()
+        row = conn.execute("SELECT value, expires, last_used FROM entries WHERE key = ?",
+                           (digest,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            self._stats['misses'] += 1
+            return False, None
+        if now - row[2] > 1.0:
+            # Refresh recency at most once a second so hits stay read-only
+            conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, digest))
+        self._stats['hits'] += 1
+        return True, loads(row[0])
+
+    def generation(self, database, tables):
+        """Snapshot of the invalidation counters for tables, to pass back to set()."""
+        conn = self._conn()
+        result = {}
+        for table in tables:
+            row = conn.execute("SELECT generation FROM generations WHERE db = ? AND tbl = ?",
+                               (database, table)).fetchone()
+            result[table] = row[0] if row else 0
+        return result
+
+    def set(self, key, value, tables, ttl=None, generation=None):
+        """Stores a result read from tables, unless they were invalidated since generation."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl is not None and ttl <= 0:
+            return  # ttl=0: don't cache
+        blob = dumps(value)
+        if len(blob) > self.max_bytes:
+            return
+        database = key[0]
+        tables = sorted(frozenset(tables))
+        digest = self._digest(key)
+        now = time.time()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if generation is not None and self.generation(database, tables) != generation:
+                conn.execute("ROLLBACK")
+                return
+            conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                         (digest, blob, len(blob), now + ttl if ttl is not None else None, now))
+            conn.executemany("INSERT OR IGNORE INTO entry_tables VALUES (?, ?, ?)",
+                             [(database, table, digest) for table in tables])
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for digest, size in conn.execute("SELECT key, size FROM entries ORDER BY last_used"):
+            victims.append((digest,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        conn.executemany("DELETE FROM entry_tables WHERE key = ?", victims)
+
+    def invalidate_tables(self, database, tables):
+        """Drops every entry for database that read any of tables, in all processes."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for table in tables:
+                table = table.lower()
+                conn.execute("""
+                    INSERT INTO generations VALUES (?, ?, 1)
+                    ON CONFLICT (db, tbl) DO UPDATE SET generation = generation + 1
+                """, (database, table))
+                conn.execute("""
+                    DELETE FROM entries WHERE key IN (
+                        SELECT key FROM entry_tables WHERE db = ? AND tbl = ?)
+                """, (database, table))
+                conn.execute("DELETE FROM entry_tables WHERE db = ? AND tbl = ?",
+                             (database, table))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        """Empties the shared cache for every process."""
+        self._conn().executescript("DELETE FROM entries; DELETE FROM entry_tables;")
+
+    def stats(self):
+        """Returns this process's hit/miss counters and the shared cache's usage."""
+        entries, size = self._conn().execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        snapshot = dict(self._stats)
+        snapshot.update(entries=entries, bytes=size, max_bytes=self.max_bytes)
+        return snapshot
+
+def invalidate_tables(database, tables):
+    """Invalidates tables of database in every live QueryCache."""
+    for cache in list(_caches):
+        cache.invalidate_tables(database, tables)
+
+@contextmanager
+def record_writes(conn):
+    """Collects the tables written through conn while the block runs."""
+    written = set()
+
+    def trace(statement):
+        table = table_written(statement)
+        if table is not None:
+            written.add(table)
+
+    conn.set_trace_callback(trace)
+    try:
+        yield written
+    finally:
+        conn.set_trace_callback(None)
@@ -0,0 +1,240 @@
+import sys
+import time
+import timeit
+import sqlite3
+import functools
+import weakref
+import threading
+from collections import OrderedDict
+from profiling import registry
+
+# Applied once when a pooled connection is opened, not on every call
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -20000),      # negative means KiB, so ~20 MB of page cache
+    ('mmap_size', 268435456),    # 256 MB
+)
+
+# sqlite3 keeps this many compiled statements per pooled connection (default is 128)
+DEFAULT_CACHED_STATEMENTS = 256
+
+class StatementTracker:
+    """Mirrors a connection's LRU statement cache to report hits and misses.
+
+    sqlite3 doesn't expose its statement cache, so this replays the same
+    LRU policy over the SQL texts passed to execute().
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._recent = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, sql):
+        if sql in self._recent:
+            self._recent.move_to_end(sql)
+            self.hits += 1
+        else:
+            self._recent[sql] = None
+            self.misses += 1
+            if len(self._recent) > self.capacity:
+                self._recent.popitem(last=False)
+
+    def __len__(self):
+        return len(self._recent)
+
+# id(conn) -> StatementTracker for every connection a pool has opened
+_trackers = {}
+
+def execute(conn, sql, params=()):
+    """conn.execute() that keeps statement-cache hit/miss counts for pooled connections.
+
+    Pass the same SQL text with bound parameters (never format values into
+    it) so repeated calls reuse the compiled statement.
+    """
+    tracker = _trackers.get(id(conn))
+    if tracker is not None:
+        tracker.record(sql)
+    return conn.execute(sql, params)
+
+# Connections whose open transaction must survive release, see hold_transaction()
+_held_transactions = set()
+
+def hold_transaction(conn):
+    """Keeps conn's open transaction alive across releases until let_go_transaction()."""
+    _held_transactions.add(id(conn))
+
+def let_go_transaction(conn):
+    """Undoes hold_transaction(); the next outermost release resets conn as usual."""
+    _held_transactions.discard(id(conn))
+
+class _ThreadConnection:
+    """A thread's pooled connection and borrow depth, kept in thread-local storage."""
+    def __init__(self, conn):
+        self.conn = conn
+        self.depth = 0
+
+class ConnectionPool:
+    """Thread-local pool of SQLite connections to one database file.
+
+    Each thread keeps one open connection and reuses it across calls. Nested
+    borrows in the same thread share the connection, and only the outermost
+    release resets it, so an enclosing transaction is never rolled back by an
+    inner call. A thread's connection is closed when the thread exits.
+    """
+    def __init__(self, database='users.db', pragmas=DEFAULT_PRAGMAS,
+                 cached_statements=DEFAULT_CACHED_STATEMENTS):
+        self.database = database
+        self.pragmas = pragmas
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._hits = 0
+        self._misses = 0
+
+    def _open(self):
+        # check_same_thread is off so close_all() can run from any thread;
+        # each connection is still only used by the thread that opened it
+        conn = sqlite3.connect(self.database, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        with self._lock:
+            self._connections.append(conn)
+        _trackers[id(conn)] = StatementTracker(self.cached_statements)
+        return conn
+
+    def _discard(self, conn):
+        """Closes a connection whose thread has exited (or the pool closed)."""
+        with self._lock:
+            if conn not in self._connections:
+                return
+            self._connections.remove(conn)
+        _trackers.pop(id(conn), None)
+        _held_transactions.discard(id(conn))
+        conn.close()
+
+    def acquire(self):
+        """Returns this thread's connection, opening it on first use."""
+        holder = getattr(self._local, 'holder', None)
+        if holder is None:
+            holder = _ThreadConnection(self._open())
+            # Thread-local storage is dropped when the thread exits, taking holder with it
+            weakref.finalize(holder, self._discard, holder.conn)
+            self._local.holder = holder
+            with self._lock:
+                self._misses += 1
+        else:
+            with self._lock:
+                self._hits += 1
+        holder.depth += 1
+        return holder.conn
+
+    def release(self, conn):
+        """Releases a borrow; the outermost one rolls back anything left uncommitted."""
+        holder = self._local.holder
+        holder.depth -= 1
+        if (holder.depth == 0 and conn.in_transaction
+                and id(conn) not in _held_transactions):
+            # Mirrors close() on a fresh connection, which discards uncommitted work
+            conn.rollback()
+
+    def stats(self):
+        """Returns pool hit/miss counters and the number of open connections."""
+        with self._lock:
+            total = self._hits + self._misses
+            trackers = [_trackers[id(conn)] for conn in self._connections if id(conn) in _trackers]
+            statement_hits = sum(tracker.hits for tracker in trackers)
+            statement_misses = sum(tracker.misses for tracker in trackers)
+            lookups = statement_hits + statement_misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_ratio': self._hits / total if total else 0.0,
+                'connections': len(self._connections),
+                'statements_cached': sum(len(tracker) for tracker in trackers),
+                'statement_capacity': self.cached_statements,
+                'statement_hits': statement_hits,
+                'statement_misses': statement_misses,
+                'statement_hit_ratio': statement_hits / lookups if lookups else 0.0,
+            }
+
+    def close_all(self):
+        """Closes every connection the pool has opened."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            _trackers.pop(id(conn), None)
+            conn.close()
+        self._local = threading.local()
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+def get_pool(database='users.db'):
+    """Returns the shared pool for a database file, creating it on first use."""
+    with _pools_lock:
+        if database not in _pools:
+            _pools[database] = ConnectionPool(database)
+        return _pools[database]
+
+def with_pooled_connection(func=None, *, database='users.db'):
+    """Decorator like with_db_connection that reuses a per-thread connection.
+
+    Usable bare (@with_pooled_connection) or with a database
+    (@with_pooled_connection(database='other.db')).
+    """
+    if func is None:
+        return functools.partial(with_pooled_connection, database=database)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        pool = get_pool(database)
+        start = time.perf_counter_ns()
+        conn = pool.acquire()
+        registry.record_connection(func.__qualname__, time.perf_counter_ns() - start)
+        try:
+            return func(conn, *args, **kwargs)
+        finally:
+            pool.release(conn)
+    return wrapper
+
+def benchmark(database='users.db', calls=10000):
+    """Compares per-call cost of connect-per-call against a warm pooled connection."""
+    sql = "SELECT * FROM users WHERE id = ?"
+
+    def connect_per_call():
+        conn = sqlite3.connect(database)
+        try:
+            conn.execute(sql, (1,)).fetchone()
+        finally:
+            conn.close()
+
+    def uncached_statement():
+        conn = get_pool(database).acquire()
+        try:
+            # Different SQL text each time defeats the statement cache
+            conn.execute(f"SELECT * FROM users WHERE id = 1 -- {uncached_statement.n}").fetchone()
+            uncached_statement.n += 1
+        finally:
+            get_pool(database).release(conn)
+    uncached_statement.n = 0
+
+    def pooled_cached():
+        conn = get_pool(database).acquire()
+        try:
+            execute(conn, sql, (1,)).fetchone()
+        finally:
+            get_pool(database).release(conn)
+
+    for label, call in (('connect per call', connect_per_call),
+                        ('pooled, re-prepared', uncached_statement),
+                        ('pooled, cached statement', pooled_cached)):
+        seconds = timeit.timeit(call, number=calls)
+        print(f"{label:>26}: {seconds / calls * 1e6:8.2f} us/call")
+    print(get_pool(database).stats())
+
+if __name__ == "__main__":
+    benchmark(*sys.argv[1:2])
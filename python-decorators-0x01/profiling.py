@@ -0,0 +1,217 @@
+import re
+import threading
+from functools import lru_cache
+
+# Each power of two is split into this many linear sub-buckets, so a recorded
+# latency is off by at most 1/16 (~6%) of its value, HDR-histogram style
+SUB_BUCKETS = 16
+_LINEAR_LIMIT = 2 * SUB_BUCKETS
+_SHIFT_BITS = _LINEAR_LIMIT.bit_length() - 1
+
+# Bucket boundaries, in seconds, used for the Prometheus export
+EXPORT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                  0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+@lru_cache(maxsize=1024)
+def normalize(query):
+    """Reduces a statement to its shape: literals become ? and whitespace is collapsed."""
+    shape = _STRING_LITERAL.sub('?', query)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _IN_LIST.sub('IN (?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip().rstrip(';')
+
+class LatencyHistogram:
+    """Log-linear histogram of nanosecond latencies with bounded relative error."""
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    @staticmethod
+    def _index(value):
+        if value < _LINEAR_LIMIT:
+            return value
+        shift = value.bit_length() - _SHIFT_BITS
+        return shift * SUB_BUCKETS + (value >> shift)
+
+    @staticmethod
+    def _upper_bound(index):
+        """Largest value that lands in bucket index."""
+        if index < _LINEAR_LIMIT:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        sub = index - shift * SUB_BUCKETS
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value):
+        value = max(0, int(value))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, percentile):
+        """Value at or below which percentile% of recordings fall (bucket upper bound)."""
+        if not self.count:
+            return None
+        target = max(1, percentile / 100 * self.count)
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper_bound(index), self.max)
+        return self.max
+
+    def cumulative(self, bounds):
+        """Counts of recordings <= each bound, for fixed-bucket exports."""
+        ordered = sorted(self.counts.items())
+        result = []
+        position = 0
+        seen = 0
+        for bound in bounds:
+            while position < len(ordered) and self._upper_bound(ordered[position][0]) <= bound:
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+class StatementStats:
+    """Counters and latency histogram for one normalized statement."""
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.rows = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.latency = LatencyHistogram()
+
+class ProfilingRegistry:
+    """Thread-safe per-statement query profile fed by the decorators in this package."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._statements = {}
+        self._connections = {}  # function name -> LatencyHistogram of acquire times
+
+    def _stats_for(self, query):
+        shape = normalize(query)
+        stats = self._statements.get(shape)
+        if stats is None:
+            stats = self._statements[shape] = StatementStats()
+        return stats
+
+    def record_query(self, query, latency_ns, rows=None, error=False):
+        with self._lock:
+            stats = self._stats_for(query)
+            stats.calls += 1
+            stats.latency.record(latency_ns)
+            if rows:
+                stats.rows += rows
+            if error:
+                stats.errors += 1
+
+    def record_cache(self, query, hit):
+        with self._lock:
+            stats = self._stats_for(query)
+            if hit:
+                stats.cache_hits += 1
+            else:
+                stats.cache_misses += 1
+
+    def record_connection(self, function, acquire_ns):
+        with self._lock:
+            histogram = self._connections.get(function)
+            if histogram is None:
+                histogram = self._connections[function] = LatencyHistogram()
+            histogram.record(acquire_ns)
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self._connections.clear()
+
+    def snapshot(self):
+        """Returns per-statement and per-function numbers, statements ordered by total time."""
+        with self._lock:
+            statements = []
+            for shape, stats in self._statements.items():
+                latency = stats.latency
+                lookups = stats.cache_hits + stats.cache_misses
+                statements.append({
+                    'statement': shape,
+                    'calls': stats.calls,
+                    'errors': stats.errors,
+                    'rows': stats.rows,
+                    'total_ms': latency.total / 1e6,
+                    'mean_ms': latency.total / latency.count / 1e6 if latency.count else None,
+                    'p50_ms': _ms(latency.percentile(50)),
+                    'p95_ms': _ms(latency.percentile(95)),
+                    'p99_ms': _ms(latency.percentile(99)),
+                    'max_ms': _ms(latency.max),
+                    'cache_hit_ratio': stats.cache_hits / lookups if lookups else None,
+                })
+            connections = {
+                function: {'count': histogram.count,
+                           'mean_ms': histogram.total / histogram.count / 1e6,
+                           'p99_ms': _ms(histogram.percentile(99))}
+                for function, histogram in self._connections.items()
+            }
+        statements.sort(key=lambda item: item['total_ms'], reverse=True)
+        return {'statements': statements, 'connections': connections}
+
+    def prometheus_text(self):
+        """Renders the registry in the Prometheus text exposition format."""
+        lines = [
+            '# HELP db_query_duration_seconds Query latency by normalized statement.',
+            '# TYPE db_query_duration_seconds histogram',
+        ]
+        counters = {
+            'db_query_rows_total': [],
+            'db_query_errors_total': [],
+            'db_query_cache_hits_total': [],
+            'db_query_cache_misses_total': [],
+        }
+        with self._lock:
+            bounds_ns = [bound * 1e9 for bound in EXPORT_BUCKETS]
+            for shape, stats in self._statements.items():
+                label = f'statement="{_escape(shape)}"'
+                latency = stats.latency
+                for bound, seen in zip(EXPORT_BUCKETS, latency.cumulative(bounds_ns)):
+                    lines.append(f'db_query_duration_seconds_bucket{{{label},le="{bound}"}} {seen}')
+                lines.append(f'db_query_duration_seconds_bucket{{{label},le="+Inf"}} {latency.count}')
+                lines.append(f'db_query_duration_seconds_sum{{{label}}} {latency.total / 1e9}')
+                lines.append(f'db_query_duration_seconds_count{{{label}}} {latency.count}')
+                counters['db_query_rows_total'].append(f'{{{label}}} {stats.rows}')
+                counters['db_query_errors_total'].append(f'{{{label}}} {stats.errors}')
+                counters['db_query_cache_hits_total'].append(f'{{{label}}} {stats.cache_hits}')
+                counters['db_query_cache_misses_total'].append(f'{{{label}}} {stats.cache_misses}')
+            connections = [(function, histogram.total, histogram.count)
+                           for function, histogram in self._connections.items()]
+
+        for name, samples in counters.items():
+            lines.append(f'# TYPE {name} counter')
+            lines.extend(name + sample for sample in samples)
+        lines.append('# HELP db_connection_acquire_seconds Time spent obtaining a connection.')
+        lines.append('# TYPE db_connection_acquire_seconds summary')
+        for function, total, count in connections:
+            label = f'function="{_escape(function)}"'
+            lines.append(f'db_connection_acquire_seconds_sum{{{label}}} {total / 1e9}')
+            lines.append(f'db_connection_acquire_seconds_count{{{label}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+def _ms(value_ns):
+    return None if value_ns is None else value_ns / 1e6
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Process-wide registry the decorators report into
+registry = ProfilingRegistry()
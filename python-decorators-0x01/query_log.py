@@ -0,0 +1,130 @@
+import sys
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+import random
+from profiling import registry
+
+# Query events go to this logger; handlers attached by configure() run on a
+# background thread so the caller only pays for an enqueue.
+logger = logging.getLogger('queries')
+
+_listener = None
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves all formatting to the listener thread."""
+    def prepare(self, record):
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """Formats a query event record as one JSON object per line."""
+    def format(self, record):
+        event = dict(getattr(record, 'query_event', {}))
+        event['ts'] = record.created
+        event['level'] = record.levelname
+        event['thread'] = record.threadName
+        return json.dumps(event, default=str)
+
+def _start_listener(handlers):
+    """Starts the queue listener feeding handlers and returns the enqueueing handler."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+    if not handlers:
+        stream = logging.StreamHandler(sys.stderr)
+        stream.setFormatter(JsonFormatter())
+        handlers = (stream,)
+    events = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(events, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _DeferredQueueHandler(events)
+
+def configure(*handlers, level=logging.INFO):
+    """Routes query events through a queue to handlers (stderr JSON lines by default).
+
+    Replaces any handlers on the 'queries' logger and stops propagation to
+    ancestors. Safe to call again to swap handlers; the previous listener is
+    stopped first.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(_start_listener(handlers))
+    logger.setLevel(level)
+    logger.propagate = False
+
+_checked = False
+
+def ensure_configured():
+    """On the first query event, falls back to the default queue-backed handler.
+
+    Nothing is installed if configure() already ran or the application
+    handles the 'queries' logger itself, directly or through an ancestor;
+    in that case its handlers, level and propagation are left untouched.
+    """
+    global _checked
+    if _checked:
+        return
+    _checked = True
+    if _listener is None and not logger.hasHandlers():
+        logger.addHandler(_start_listener(()))
+        if logger.level == logging.NOTSET:
+            logger.setLevel(logging.INFO)
+
+def shutdown():
+    """Flushes pending events and stops the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown)
+
+def param_shape(args, kwargs):
+    """Describes bound parameters by type only, so values never reach the logs."""
+    def shape(value):
+        if isinstance(value, (list, tuple)):
+            return [shape(item) for item in value]
+        if isinstance(value, dict):
+            return {key: shape(item) for key, item in value.items()}
+        return type(value).__name__
+    return {'args': shape(args), 'kwargs': shape(kwargs)} if kwargs else shape(args)
+
+def row_count(result):
+    """Best-effort number of rows in a query result."""
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    rowcount = getattr(result, 'rowcount', None)
+    return rowcount if rowcount is not None and rowcount >= 0 else None
+
+def caller_of(depth=2):
+    """Returns 'file:line:function' for the frame depth levels above the caller."""
+    frame = sys._getframe(depth)
+    return f"{frame.f_code.co_filename}:{frame.f_lineno}:{frame.f_code.co_name}"
+
+def record(query, args, kwargs, result, error, latency_ns, caller, sample_rate, slow_ns):
+    """Feeds one finished call into the profile and, unless sampled out, the log.
+
+    The profile sees every call; only the log output is sampled, and slow or
+    failed queries are always logged.
+    """
+    ensure_configured()
+    rows = row_count(result)
+    registry.record_query(query, latency_ns, rows, error is not None)
+    slow = latency_ns >= slow_ns
+    if slow or error is not None or sample_rate >= 1.0 or random.random() < sample_rate:
+        emit({
+            'query': query,
+            'params': param_shape(args, kwargs),
+            'latency_ns': latency_ns,
+            'rows': rows,
+            'caller': caller,
+            'error': repr(error) if error is not None else None,
+        }, slow)
+
+def emit(event, slow):
+    """Queues a query event: WARNING for slow queries, INFO otherwise."""
+    level = logging.WARNING if slow else logging.INFO
+    if logger.isEnabledFor(level):
+        logger.log(level, "query", extra={'query_event': event})
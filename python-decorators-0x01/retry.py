@@ -0,0 +1,175 @@
+import time
+import random
+import sqlite3
+import threading
+
+# sqlite3.OperationalError covers both transient contention and permanent
+# mistakes (syntax errors, missing tables); only these messages are worth retrying
+TRANSIENT_SQLITE_MESSAGES = (
+    'database is locked',
+    'database table is locked',
+    'database schema has changed',
+    'disk i/o error',
+    'unable to open database file',
+)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the function while the circuit breaker is open."""
+
+def is_transient(error):
+    """Default classifier: True for errors a retry can plausibly fix."""
+    if isinstance(error, sqlite3.OperationalError):
+        message = str(error).lower()
+        return any(text in message for text in TRANSIENT_SQLITE_MESSAGES)
+    return isinstance(error, (ConnectionError, TimeoutError))
+
+def backoff_delay(attempt, base, cap):
+    """Exponential backoff with full jitter: uniform(0, min(cap, base * 2**attempt))."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of successful calls.
+
+    Every success deposits ratio tokens, every retry withdraws one. Once the
+    bucket is empty further retries are refused, so a brownout can add at
+    most ~ratio extra load instead of multiplying it by the retry count.
+    min_per_second tokens trickle in regardless so rare callers can retry.
+    """
+    def __init__(self, ratio=0.1, min_per_second=1.0, max_tokens=10.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens,
+                           self._tokens + (now - self._updated) * self.min_per_second)
+        self._updated = now
+
+    def record_success(self):
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_spend(self):
+        """Withdraws one token for a retry; False means the budget is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+class CircuitBreaker:
+    """Fails fast after failure_threshold consecutive failures.
+
+    The circuit stays open for reset_timeout seconds, then lets a single
+    trial call through (half-open): success closes it, failure reopens it.
+    allow() hands the trial call its own token so that only that call can
+    give the slot back with abandon_trial().
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial = None  # token of the running half-open trial
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Returns True when closed, a trial token when half-open, False to fail fast."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial is not None:
+                return False
+            self._trial = object()
+            return self._trial
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def abandon_trial(self, admission):
+        """Call ended without a verdict (cancelled, interrupted): free the trial slot.
+
+        admission is what allow() returned for that call; calls that were not
+        the trial leave the slot alone.
+        """
+        with self._lock:
+            if admission is not True and admission is self._trial:
+                self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial = None
+
+class RetryPolicy:
+    """Per-function retry decisions shared by the sync and async retry_on_failure.
+
+    retry_on is either a predicate on the exception or an exception
+    class/tuple. budget and breaker may be None to opt out of either.
+    """
+    def __init__(self, name, retries, delay, max_delay, retry_on, budget, breaker):
+        if isinstance(retry_on, (type, tuple)):
+            error_types = retry_on
+            retry_on = lambda error: isinstance(error, error_types)
+        self.name = name
+        self.retries = retries
+        self.delay = delay
+        self.max_delay = max_delay
+        self.retry_on = retry_on
+        self.budget = budget
+        self.breaker = breaker
+
+    def before_attempt(self):
+        """Returns the breaker's admission for this attempt, pass it to abandoned()."""
+        if self.breaker is None:
+            return True
+        admission = self.breaker.allow()
+        if not admission:
+            raise CircuitOpenError(f"Circuit open, not calling {self.name}")
+        return admission
+
+    def succeeded(self):
+        if self.budget is not None:
+            self.budget.record_success()
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def abandoned(self, admission):
+        """The attempt was cancelled or interrupted: neither success nor failure."""
+        if self.breaker is not None:
+            self.breaker.abandon_trial(admission)
+
+    def next_delay(self, attempt, e):
+        """Returns how long to wait before retrying, or None to re-raise."""
+        if not self.retry_on(e):
+            # The database answered, it just didn't like the request
+            if self.breaker is not None:
+                self.breaker.record_success()
+            print(f"Attempt {attempt + 1} failed with a non-retryable error: {e}")
+            return None
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        if attempt >= self.retries - 1:  # Check if there are retries left
+            print("All attempts failed.")
+            return None
+        if self.budget is not None and not self.budget.try_spend():
+            print(f"Attempt {attempt + 1} failed: {e}. Retry budget exhausted.")
+            return None
+        wait = backoff_delay(attempt, self.delay, self.max_delay)
+        print(f"Attempt {attempt + 1} failed: {e}. Retrying in {wait:.2f} seconds...")
+        return wait
+
+# Process-wide defaults shared by every decorated function
+default_budget = RetryBudget()
+default_breaker = CircuitBreaker()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the retry policy shared by the retry_on_failure decorators
+"""
+import asyncio
+import importlib
+import unittest
+from retry import CircuitBreaker, CircuitOpenError
+
+retry_on_failure = importlib.import_module('3-retry_on_failure').retry_on_failure
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """
+    Test the half-open trial of CircuitBreaker
+    """
+    def open_breaker(self):
+        """Return a breaker that is open and due for its trial call"""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        return breaker
+
+    def test_cancelled_trial_frees_the_slot(self):
+        """
+        Test that a cancelled trial call doesn't leave the circuit open
+        """
+        breaker = self.open_breaker()
+
+        @retry_on_failure(retries=1, budget=None, breaker=breaker)
+        async def trial():
+            await asyncio.sleep(10)
+
+        async def main():
+            task = asyncio.ensure_future(trial())
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        self.assertTrue(breaker.allow())
+
+    def test_interrupted_trial_frees_the_slot(self):
+        """
+        Test that a trial interrupted by KeyboardInterrupt frees the slot
+        """
+        breaker = self.open_breaker()
+
+        @retry_on_failure(retries=1, budget=None, breaker=breaker)
+        def trial():
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            trial()
+        self.assertTrue(breaker.allow())
+
+    def test_cancelled_bystander_keeps_the_trial(self):
+        """
+        Test that a call admitted before the circuit opened can't free the
+        slot of the trial that is running now
+        """
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+
+        @retry_on_failure(retries=1, budget=None, breaker=breaker)
+        def bystander():
+            breaker.record_failure()
+            self.assertTrue(breaker.allow())
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            bystander()
+        self.assertFalse(breaker.allow())
+
+    def test_trial_blocks_other_calls(self):
+        """
+        Test that only one call is let through while the trial runs
+        """
+        breaker = self.open_breaker()
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        @retry_on_failure(retries=1, budget=None, breaker=breaker)
+        def call():
+            return 42
+
+        with self.assertRaises(CircuitOpenError):
+            call()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,32 +1,64 @@
 import mysql.connector
 import os
+import sys
+import multiprocessing
+from seed import connect_to_prodev, pooled_connection, stream_query
 
-def connect_to_prodev():
-    """Connects to the ALX_prodev database in MySQL."""
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),          # Get from environment variable
-            user=os.getenv('DB_USER'),          # Get from environment variable
-            password=os.getenv('DB_PASSWORD'),   # Get from environment variable
-            database='ALX_prodev'
-        )
-        return connection
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-        return None
-
-def stream_users():
-    """Generator that streams rows from the user_data table one by one."""
+def stream_users(server_side=False, chunk_size=1000):
+    """Generator that streams rows from the user_data table one by one.
+
+    With server_side=True rows come from an unbuffered cursor in fetchmany()
+    chunks and are yielded as tuples, so memory stays flat as the table grows.
+    """
+    with pooled_connection() as connection:
+        if server_side:
+            yield from stream_query(connection, "SELECT * FROM user_data;", chunk_size=chunk_size)
+            return
+
+        cursor = connection.cursor(dictionary=True)  # Use dictionary for easy row access
+        cursor.execute("SELECT * FROM user_data;")
+
+        # Use a single loop to yield rows
+        for row in cursor:
+            yield row  # Yield each row one by one
+
+        cursor.close()
+
+def _peak_rss_kb(limit, server_side, result):
+    """Streams `limit` rows and stores the peak RSS of this process in result."""
+    import resource  # Unix only, so the generator itself still imports on Windows
     connection = connect_to_prodev()
-    if connection is None:
-        return
+    if server_side:
+        rows = stream_query(connection, "SELECT * FROM user_data LIMIT %s", (limit,))
+    else:
+        # Tuples like the server-side path, so only the buffering differs
+        cursor = connection.cursor(buffered=True)
+        cursor.execute("SELECT * FROM user_data LIMIT %s", (limit,))
+        rows = iter(cursor)
+    for _ in rows:
+        pass
+    if connection.is_connected():
+        connection.close()
+    result.value = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
 
-    cursor = connection.cursor(dictionary=True)  # Use dictionary for easy row access
-    cursor.execute("SELECT * FROM user_data;")
+def benchmark_memory(sizes=(10_000, 100_000, 1_000_000, 10_000_000)):
+    """Prints peak RSS for buffered vs server-side streaming at each row count.
 
-    # Use a single loop to yield rows
-    for row in cursor:
-        yield row  # Yield each row one by one
+    Each run happens in a fresh process so the peaks don't leak into each other.
+    Both sides read tuple rows. Needs the Unix resource module.
+    user_data must hold at least max(sizes) rows (see seed.bulk_insert_data).
+    """
+    print(f"{'rows':>12} {'buffered KB':>14} {'server-side KB':>16}")
+    for size in sizes:
+        peaks = []
+        for server_side in (False, True):
+            result = multiprocessing.Value('q', 0)
+            worker = multiprocessing.Process(target=_peak_rss_kb, args=(size, server_side, result))
+            worker.start()
+            worker.join()
+            peaks.append(result.value)
+        print(f"{size:>12} {peaks[0]:>14} {peaks[1]:>16}")
 
-    cursor.close()
-    connection.close()
\ No newline at end of file
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_memory()
@@ -1,38 +1,30 @@
 import mysql.connector
 import os
+import sys
+import time
+import tracemalloc
+from array import array
+from seed import IDENTIFIER, pooled_connection
 
-def connect_to_prodev():
-    """Connects to the ALX_prodev database in MySQL."""
-    try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),          # Get from environment variable
-            user=os.getenv('DB_USER'),          # Get from environment variable
-            password=os.getenv('DB_PASSWORD'),   # Get from environment variable
-            database='ALX_prodev'
-        )
-        return connection
-    except mysql.connector.Error as err:
-        print(f"Error: {err}")
-        return None
+FILTER_OPERATORS = {'=', '!=', '<', '<=', '>', '>='}
+
+# Columns that are packed into typed arrays instead of plain lists
+COLUMN_TYPECODES = {'age': 'i'}
 
 def stream_users_in_batches(batch_size):
     """Generator that yields batches of user data from the database."""
-    connection = connect_to_prodev()
-    if connection is None:
-        return
-
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM user_data;")
+    with pooled_connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM user_data;")
 
-    # Fetch rows in batches
-    while True:
-        batch = cursor.fetchmany(batch_size)
-        if not batch:
-            break
-        yield batch
+        # Fetch rows in batches
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
 
-    cursor.close()
-    connection.close()
+        cursor.close()
 
 def batch_processing(batch_size):
     """Processes each batch to filter users over the age of 25."""
@@ -41,7 +33,79 @@ def batch_processing(batch_size):
             if user['age'] > 25:
                 yield user  # Yield users over the age of 25
 
+def stream_column_batches(batch_size, columns=('user_id', 'name', 'email', 'age'),
+                          filters=(), typecodes=COLUMN_TYPECODES):
+    """Generator that yields batches from user_data as {column: values} dicts.
+
+    Projection and filters are pushed into the SQL select list and WHERE
+    clause. filters is a sequence of (column, operator, value) tuples that
+    are ANDed together, with values sent as bound parameters. Columns listed
+    in typecodes come back as array.array of that typecode, others as lists.
+    """
+    for column in columns:
+        if not IDENTIFIER.match(column):
+            raise ValueError(f"Invalid column name: {column}")
+    conditions = []
+    params = []
+    for column, operator, value in filters:
+        if not IDENTIFIER.match(column) or operator not in FILTER_OPERATORS:
+            raise ValueError(f"Invalid filter: {column} {operator}")
+        conditions.append(f"{column} {operator} %s")
+        params.append(value)
+
+    query = f"SELECT {', '.join(columns)} FROM user_data"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+
+    with pooled_connection() as connection:
+        cursor = connection.cursor()
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            batch = {}
+            for column, values in zip(columns, zip(*rows)):
+                typecode = typecodes.get(column)
+                if typecode is None:
+                    batch[column] = list(values)
+                else:
+                    # DECIMAL columns arrive as Decimal, which array() won't take directly
+                    convert = float if typecode in 'fd' else int
+                    batch[column] = array(typecode, map(convert, values))
+            yield batch
+        cursor.close()
+
+def batch_processing_columnar(batch_size):
+    """Columnar counterpart of batch_processing: users over 25 filtered in SQL."""
+    yield from stream_column_batches(batch_size, filters=[('age', '>', 25)])
+
+def benchmark(batch_size=1000):
+    """Compares rows/sec and peak Python memory of batch_processing and batch_processing_columnar."""
+    def measure(consume):
+        tracemalloc.start()
+        start = time.perf_counter()
+        rows = consume()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return rows, elapsed, peak
+
+    def rows_dicts():
+        return sum(1 for _ in batch_processing(batch_size))
+
+    def rows_columnar():
+        return sum(len(batch['age']) for batch in batch_processing_columnar(batch_size))
+
+    for label, consume in (('dict rows', rows_dicts), ('columnar', rows_columnar)):
+        rows, elapsed, peak = measure(consume)
+        rate = rows / elapsed if elapsed > 0 else 0
+        print(f"{label:>10}: {rows} rows, {rate:.0f} rows/sec, peak {peak / 1024:.0f} KiB")
+
 # Example usage (remove this part if you don't want to execute on import)
 if __name__ == "__main__":
-    for user in batch_processing(50):
-        print(user)
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark()
+    else:
+        for user in batch_processing(50):
+            print(user)
\ No newline at end of file
@@ -1,14 +1,16 @@
 import mysql.connector
 import os
-from seed import connect_to_prodev
+import json
+import base64
+from seed import pooled_connection, IDENTIFIER
 
 def paginate_users(page_size, offset):
     """Fetches a page of users from the database."""
-    connection = connect_to_prodev()
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute(f"SELECT * FROM user_data LIMIT {page_size} OFFSET {offset}")
-    rows = cursor.fetchall()
-    connection.close()
+    with pooled_connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT * FROM user_data LIMIT %s OFFSET %s", (page_size, offset))
+        rows = cursor.fetchall()
+        cursor.close()
     return rows
 
 def lazy_paginate(page_size):
@@ -19,4 +21,56 @@ def lazy_paginate(page_size):
         if not page:  # If there are no more rows, stop the generator
             break
         yield page  # Yield the current page
-        offset += page_size  # Move to the next offset
\ No newline at end of file
+        offset += page_size  # Move to the next offset
+
+def encode_cursor(key, value):
+    """Encodes the last seen key value into an opaque, resumable cursor token."""
+    payload = json.dumps({'key': key, 'after': value}, default=str)
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(token):
+    """Decodes a cursor token produced by encode_cursor into (key, value)."""
+    payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+    return payload['key'], payload['after']
+
+def keyset_paginate(page_size, key='user_id', cursor_token=None, table='user_data'):
+    """Generator that yields (page, cursor_token) using keyset (seek) pagination.
+
+    Each page is fetched with WHERE key > last_seen ORDER BY key LIMIT page_size,
+    so deep pages cost the same as the first one as long as key is indexed.
+    Pass a previously yielded cursor_token to resume after that page.
+    """
+    if not IDENTIFIER.match(key) or not IDENTIFIER.match(table):
+        raise ValueError("key and table must be plain column/table names")
+
+    after = None
+    if cursor_token is not None:
+        token_key, after = decode_cursor(cursor_token)
+        if token_key != key:
+            raise ValueError(f"cursor token was issued for key '{token_key}', not '{key}'")
+
+    with pooled_connection() as connection:
+        # One prepared statement for the first page and one reused for every page after it
+        first_page = connection.cursor(prepared=True)
+        next_page = connection.cursor(prepared=True)
+        first_query = f"SELECT * FROM {table} ORDER BY {key} LIMIT %s"
+        next_query = f"SELECT * FROM {table} WHERE {key} > %s ORDER BY {key} LIMIT %s"
+        try:
+            while True:
+                if after is None:
+                    first_page.execute(first_query, (page_size,))
+                    cursor = first_page
+                else:
+                    next_page.execute(next_query, (after, page_size))
+                    cursor = next_page
+                columns = cursor.column_names
+                page = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                if not page:
+                    break
+                after = page[-1][key]
+                yield page, encode_cursor(key, after)
+                if len(page) < page_size:
+                    break
+        finally:
+            first_page.close()
+            next_page.close()
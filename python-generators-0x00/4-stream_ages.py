@@ -1,21 +1,201 @@
 import mysql.connector
 import os
-from seed import connect_to_prodev
+import math
+import sqlite3
+from array import array
+from seed import pooled_connection, stream_query, IDENTIFIER
 
-def stream_user_ages():
-    """Generator that yields user ages from the user_data table one by one."""
-    connection = connect_to_prodev()
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT age FROM user_data;")
+# Aggregates each backend can compute server-side
+PUSHDOWN_SQL = {
+    'count': 'COUNT({column})',
+    'sum': 'SUM({column})',
+    'avg': 'AVG({column})',
+    'min': 'MIN({column})',
+    'max': 'MAX({column})',
+    'variance': 'VAR_POP({column})',
+}
+SQLITE_PUSHDOWN = {'count', 'sum', 'avg', 'min', 'max'}
 
-    for row in cursor:
-        yield row['age']  # Yield each user's age
+def stream_user_ages(server_side=False, chunk_size=1000):
+    """Generator that yields user ages from the user_data table one by one.
 
-    cursor.close()
-    connection.close()
+    With server_side=True ages are read through an unbuffered cursor in
+    fetchmany() chunks instead of materializing the whole result first.
+    """
+    with pooled_connection() as connection:
+        if server_side:
+            for (age,) in stream_query(connection, "SELECT age FROM user_data;", chunk_size=chunk_size):
+                yield age
+            return
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute("SELECT age FROM user_data;")
+
+        for row in cursor:
+            yield row['age']  # Yield each user's age
+
+        cursor.close()
+
+class RunningStats:
+    """Mergeable count/sum/min/max/mean/variance accumulator.
+
+    Each chunk is reduced on its own and folded in with Chan's parallel
+    update of Welford's algorithm, so variance stays numerically stable.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, chunk):
+        """Folds an array of floats into the running statistics."""
+        n_b = len(chunk)
+        if n_b == 0:
+            return
+        total_b = math.fsum(chunk)
+        mean_b = total_b / n_b
+        m2_b = math.fsum([(x - mean_b) ** 2 for x in chunk])
+
+        n_a = self.count
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self.m2 += m2_b + delta * delta * n_a * n_b / n
+        self.count = n
+        self.total += total_b
+        low, high = min(chunk), max(chunk)
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+
+    def result(self, stats):
+        """Returns the requested statistics as a dict."""
+        values = {
+            'count': self.count,
+            'sum': self.total,
+            'avg': self.mean if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'variance': self.m2 / self.count if self.count else None,
+        }
+        return {stat: values[stat] for stat in stats}
+
+def _nearest_rank(percentile, count):
+    """Zero-based index of the nearest-rank percentile in a sorted column of `count` values."""
+    return min(count - 1, max(0, math.ceil(percentile / 100 * count) - 1))
+
+def _percentile_ranks(percentiles, count):
+    """Maps each percentile key ('p50', ...) to its zero-based nearest rank."""
+    return {f'p{percentile:g}': _nearest_rank(percentile, count) for percentile in percentiles}
+
+def _pushdown_aggregate(connection, column, stats, percentiles, table):
+    """Computes the aggregates and percentiles with SQL on the server."""
+    placeholder = '?' if isinstance(connection, sqlite3.Connection) else '%s'
+    select_list = ", ".join(PUSHDOWN_SQL[stat].format(column=column) for stat in stats)
+    cursor = connection.cursor()
+    try:
+        extra = f", {select_list}" if select_list else ""
+        cursor.execute(f"SELECT COUNT({column}){extra} FROM {table}")
+        count, *values = cursor.fetchone()
+        result = {stat: (float(value) if value is not None and stat != 'count' else value)
+                  for stat, value in zip(stats, values)}
+        ranks = _percentile_ranks(percentiles, count) if count else {}
+        found = {}
+        if ranks:
+            # One sort on the server for every percentile, and only the picked
+            # rows come back (window functions: MySQL 8+, SQLite 3.25+)
+            wanted = sorted(set(ranks.values()))
+            cursor.execute(
+                f"SELECT rn, {column} FROM (SELECT {column}, "
+                f"ROW_NUMBER() OVER (ORDER BY {column}) - 1 AS rn FROM {table} "
+                f"WHERE {column} IS NOT NULL) ranked "
+                f"WHERE rn IN ({', '.join([placeholder] * len(wanted))})",
+                wanted)
+            found = {rank: float(value) for rank, value in cursor.fetchall()}
+        for percentile in percentiles:
+            key = f'p{percentile:g}'
+            result[key] = found.get(ranks.get(key))
+        return result
+    finally:
+        cursor.close()
+
+def _streaming_aggregate(connection, column, stats, percentiles, table, chunk_size):
+    """Computes the aggregates client-side over fetchmany() chunks.
+
+    Memory stays at one chunk: for percentiles the rows arrive sorted by the
+    database and the values at the nearest ranks are picked on the way past.
+    """
+    running = RunningStats()
+    ranks = {}
+    found = {}
+    cursor = connection.cursor()
+    try:
+        query = f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+        if percentiles:
+            cursor.execute(f"SELECT COUNT({column}) FROM {table}")
+            count = cursor.fetchone()[0]
+            ranks = _percentile_ranks(percentiles, count) if count else {}
+            query += f" ORDER BY {column}"
+        wanted = sorted(set(ranks.values()), reverse=True)  # next rank at the end
+        cursor.execute(query)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            chunk = array('d', [float(row[0]) for row in rows])
+            offset = running.count
+            running.update(chunk)
+            while wanted and wanted[-1] < running.count:
+                rank = wanted.pop()
+                found[rank] = chunk[rank - offset]
+    finally:
+        cursor.close()
+
+    result = running.result(stats)
+    for percentile in percentiles:
+        key = f'p{percentile:g}'
+        result[key] = found.get(ranks.get(key))
+    return result
+
+def aggregate_column(connection, column='age', stats=('avg',), percentiles=(),
+                     table='user_data', push_down=True, chunk_size=10000):
+    """Computes count/sum/avg/min/max/variance and percentiles of a column.
+
+    The work is pushed down to the database when the backend supports every
+    requested aggregate; otherwise it falls back to a streaming reducer over
+    fetchmany() chunks. Percentiles use the nearest-rank method and are
+    returned under keys like 'p50' and 'p99.9'.
+    """
+    if not IDENTIFIER.match(column) or not IDENTIFIER.match(table):
+        raise ValueError("column and table must be plain column/table names")
+    unknown = set(stats) - set(PUSHDOWN_SQL)
+    if unknown:
+        raise ValueError(f"Unsupported aggregates: {sorted(unknown)}")
+
+    supported = SQLITE_PUSHDOWN if isinstance(connection, sqlite3.Connection) else set(PUSHDOWN_SQL)
+    if push_down and set(stats) <= supported:
+        return _pushdown_aggregate(connection, column, stats, percentiles, table)
+    return _streaming_aggregate(connection, column, stats, percentiles, table, chunk_size)
+
+def calculate_average_age(push_down=True):
+    """Calculates the average age of users.
+
+    By default AVG() runs in the database; push_down=False falls back to
+    summing the stream_user_ages generator in Python. Either way the result
+    keeps the column's type (a Decimal for user_data.age).
+    """
+    if push_down:
+        with pooled_connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT AVG(age) FROM user_data")
+                average_age = cursor.fetchone()[0]
+            finally:
+                cursor.close()
+        return average_age or 0
 
-def calculate_average_age():
-    """Calculates the average age of users using the stream_user_ages generator."""
     total_age = 0
     count = 0
     
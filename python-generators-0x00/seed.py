@@ -2,6 +2,21 @@ import os
 import mysql.connector
 import csv
 import uuid
+import time
+import re
+import heapq
+import queue
+import sqlite3
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+
+# Table and column names can't be bound as parameters, so anything
+# interpolated into SQL must match this first
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
 
 def connect_db():
     """Connects to the MySQL database server."""
@@ -28,21 +43,196 @@ def create_database(connection):
     finally:
         cursor.close()
 
+def prodev_config():
+    """Connection settings for the ALX_prodev database, read from the environment."""
+    return {
+        'host': os.getenv('DB_HOST'),
+        'user': os.getenv('DB_USER'),
+        'password': os.getenv('DB_PASSWORD'),
+        'database': 'ALX_prodev',
+    }
+
 def connect_to_prodev():
     """Connects to the ALX_prodev database in MySQL."""
     try:
-        connection = mysql.connector.connect(
-            host=os.getenv('DB_HOST'),          
-            user=os.getenv('DB_USER'),          
-            password=os.getenv('DB_PASSWORD'),   
-            database='ALX_prodev'
-        )
+        connection = mysql.connector.connect(**prodev_config())
         print("Connected to ALX_prodev database.")
         return connection
     except mysql.connector.Error as err:
         print(f"Error: {err}")
         return None
 
+class ConnectionPool:
+    """Thread-safe pool of reusable connections.
+
+    Keeps at least min_size and at most max_size connections open. Idle
+    connections are handed out most-recently-used first, checked with a ping
+    on borrow when health_check is on, and closed once idle for longer than
+    idle_timeout seconds (down to min_size). metrics() reports counters and
+    the time callers spent waiting for a free connection.
+    """
+    def __init__(self, connect=None, min_size=1, max_size=10, idle_timeout=300.0,
+                 health_check=True):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1")
+        self._connect = connect or (lambda: mysql.connector.connect(**prodev_config()))
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check
+        self._cond = threading.Condition()
+        self._idle = deque()  # (connection, released_at), most recent on the right
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+        self._stats = {'created': 0, 'borrowed': 0, 'released': 0, 'discarded': 0,
+                       'evicted': 0, 'waits': 0, 'wait_time': 0.0}
+        for _ in range(min_size):
+            self._idle.append((self._create(), time.monotonic()))
+            self._size += 1
+
+    def _create(self):
+        connection = self._connect()
+        self._stats['created'] += 1
+        return connection
+
+    def _evict_idle(self):
+        """Pops connections idle past idle_timeout; caller holds the lock and closes them."""
+        evicted = []
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._idle[0][1] < cutoff and self._size > self.min_size:
+            evicted.append(self._idle.popleft()[0])
+            self._size -= 1
+            self._stats['evicted'] += 1
+        return evicted
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def acquire(self, timeout=None):
+        """Borrows a connection, blocking up to timeout seconds when the pool is exhausted."""
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        waited = False
+        evicted = []
+        with self._cond:
+            while True:
+                evicted.extend(self._evict_idle())
+                if self._idle:
+                    connection = self._idle.pop()[0]
+                    break
+                if self._size < self.max_size:
+                    connection = None
+                    self._size += 1
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f"No connection available within {timeout}s")
+                waited = True
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._stats['borrowed'] += 1
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait_time'] += time.monotonic() - start
+        for stale in evicted:
+            self._close_quietly(stale)
+
+        try:
+            if connection is not None and self.health_check and not connection.is_connected():
+                self._close_quietly(connection)
+                with self._cond:
+                    self._stats['discarded'] += 1
+                connection = None
+            if connection is None:
+                connection = self._connect()
+                with self._cond:
+                    self._stats['created'] += 1
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+        return connection
+
+    def release(self, connection):
+        """Returns a borrowed connection, discarding it if it can't be reset cleanly."""
+        reusable = True
+        try:
+            if getattr(connection, 'unread_result', False):
+                # Draining a half-read result set could mean reading the whole table
+                reusable = False
+            elif getattr(connection, 'in_transaction', False):
+                connection.rollback()
+        except Exception:
+            reusable = False
+
+        with self._cond:
+            self._in_use -= 1
+            self._stats['released'] += 1
+            keep = reusable and not self._closed  # a closed pool keeps nothing
+            if keep:
+                self._idle.append((connection, time.monotonic()))
+            else:
+                self._size -= 1
+                if not reusable:
+                    self._stats['discarded'] += 1
+            self._cond.notify()
+        if not keep:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Context manager that borrows a connection and always releases it."""
+        connection = self.acquire(timeout)
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def metrics(self):
+        """Returns a snapshot of pool counters and current occupancy."""
+        with self._cond:
+            snapshot = dict(self._stats)
+            snapshot.update(size=self._size, idle=len(self._idle), in_use=self._in_use)
+        return snapshot
+
+    def close(self):
+        """Closes every idle connection; borrowed ones are closed as they come back."""
+        with self._cond:
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._closed = True
+            self.min_size = 0
+            self.idle_timeout = 0
+        for connection in idle:
+            self._close_quietly(connection)
+
+_prodev_pool = None
+_prodev_pool_lock = threading.Lock()
+
+def get_pool():
+    """Returns the process-wide ALX_prodev pool, sized from DB_POOL_MIN/DB_POOL_MAX."""
+    global _prodev_pool
+    with _prodev_pool_lock:
+        if _prodev_pool is None:
+            _prodev_pool = ConnectionPool(
+                min_size=int(os.getenv('DB_POOL_MIN', 1)),
+                max_size=int(os.getenv('DB_POOL_MAX', 10)),
+                idle_timeout=float(os.getenv('DB_POOL_IDLE_TIMEOUT', 300)),
+            )
+        return _prodev_pool
+
+def pooled_connection(timeout=None):
+    """Borrows an ALX_prodev connection from the shared pool for a with-block."""
+    return get_pool().connection(timeout)
+
 def create_table(connection):
     """Creates a table user_data if it does not exist with the required fields."""
     cursor = connection.cursor()
@@ -88,6 +278,119 @@ def insert_data(connection, csv_file):
     print("Data inserted successfully.")
     cursor.close()
 
+BULK_INSERT_MYSQL = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (%s, %s, %s, %s)
+ON DUPLICATE KEY UPDATE
+    name = VALUES(name),
+    email = VALUES(email),
+    age = VALUES(age);
+"""
+
+BULK_INSERT_SQLITE = """
+INSERT INTO user_data (user_id, name, email, age)
+VALUES (?, ?, ?, ?)
+ON CONFLICT(user_id) DO UPDATE SET
+    name = excluded.name,
+    email = excluded.email,
+    age = excluded.age;
+"""
+
+def connect_sqlite(database='ALX_prodev.db'):
+    """Connects to a local SQLite database with the user_data table, for offline benchmarks."""
+    connection = sqlite3.connect(database)
+    create_table(connection)
+    return connection
+
+def stream_csv_chunks(csv_file, chunk_size):
+    """Generator that yields lists of (user_id, name, email, age) tuples from the CSV file."""
+    with open(csv_file, 'r', newline='') as file:
+        reader = csv.reader(file)
+        header = next(reader, None)
+        if header is None:
+            return
+        name_idx = header.index('name')
+        email_idx = header.index('email')
+        age_idx = header.index('age')
+        rows = ((str(uuid.uuid4()), row[name_idx], row[email_idx], row[age_idx])
+                for row in reader)
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            yield chunk
+
+def bulk_insert_data(connection, csv_file, batch_size=1000):
+    """Inserts data from the CSV file in batches, committing once per batch.
+
+    Works with both a MySQL connection and the SQLite fallback from connect_sqlite().
+    Returns the number of rows inserted.
+    """
+    if isinstance(connection, sqlite3.Connection):
+        insert_query = BULK_INSERT_SQLITE
+        db_error = sqlite3.Error
+    else:
+        # mysql-connector rewrites executemany() on an INSERT into one multi-row statement
+        insert_query = BULK_INSERT_MYSQL
+        db_error = mysql.connector.Error
+
+    cursor = connection.cursor()
+    total = 0
+    start = time.perf_counter()
+    try:
+        for chunk in stream_csv_chunks(csv_file, batch_size):
+            try:
+                cursor.executemany(insert_query, chunk)
+                connection.commit()
+                total += len(chunk)
+            except db_error as err:
+                connection.rollback()
+                print(f"Failed inserting batch: {err}")
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Inserted {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+    return total
+
+def load_data_infile(connection, csv_file):
+    """Loads the CSV file with LOAD DATA LOCAL INFILE, the fastest path on MySQL.
+
+    The connection must be opened with allow_local_infile=True.
+    Returns the number of rows loaded.
+    """
+    with open(csv_file, 'r', newline='') as file:
+        header = next(csv.reader(file), [])
+    # Map the CSV header onto table columns, skipping anything we don't store
+    columns = ", ".join(col if col in ('name', 'email', 'age') else '@skip'
+                        for col in header)
+    load_query = f"""
+    LOAD DATA LOCAL INFILE %s
+    INTO TABLE user_data
+    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+    IGNORE 1 LINES
+    ({columns})
+    SET user_id = UUID();
+    """
+    cursor = connection.cursor()
+    start = time.perf_counter()
+    try:
+        cursor.execute(load_query, (os.path.abspath(csv_file),))
+        connection.commit()
+        total = cursor.rowcount
+    except mysql.connector.Error as err:
+        connection.rollback()
+        print(f"Failed loading data: {err}")
+        return 0
+    finally:
+        cursor.close()
+
+    elapsed = time.perf_counter() - start
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Loaded {total} rows in {elapsed:.2f}s ({rate:.0f} rows/sec).")
+    return total
+
 def stream_rows(connection):
     """Generator that streams rows from the user_data table one by one."""
     cursor = connection.cursor()
@@ -96,6 +399,128 @@ def stream_rows(connection):
         yield row
     cursor.close()
 
+def stream_query(connection, query, params=None, chunk_size=1000):
+    """Generator that streams tuple rows through an unbuffered, server-side cursor.
+
+    Rows are pulled from the server in fetchmany() chunks, so only one chunk is
+    held client-side at a time.
+    """
+    cursor = connection.cursor(buffered=False)
+    exhausted = False
+    try:
+        cursor.execute(query, params or ())
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                exhausted = True
+                break
+            yield from rows
+    finally:
+        if exhausted:
+            cursor.close()
+        else:
+            # Stopped early: the rest of the result set is still on the wire, and
+            # reading it just to close cleanly would defeat streaming.
+            connection.shutdown()
+
+_PARTITION_DONE = object()
+
+def _put_unless_stopped(out, item, stop):
+    """Puts item on the queue, giving up once stop is set. Returns True if it was queued."""
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def _scan_partition(connection, query, params, chunk_size, out, stop):
+    """Worker: streams one partition over the connection it was given into the out queue."""
+    try:
+        rows = stream_query(connection, query, params, chunk_size)
+        try:
+            while not stop.is_set():
+                chunk = list(islice(rows, chunk_size))
+                if not chunk or not _put_unless_stopped(out, chunk, stop):
+                    break
+        finally:
+            rows.close()
+    except Exception as err:
+        _put_unless_stopped(out, err, stop)
+        return
+    _put_unless_stopped(out, _PARTITION_DONE, stop)
+
+def _drain_partitions(out, producers):
+    """Yields rows from the queue until `producers` partitions have finished."""
+    finished = 0
+    while finished < producers:
+        item = out.get()
+        if item is _PARTITION_DONE:
+            finished += 1
+        elif isinstance(item, Exception):
+            raise item
+        else:
+            yield from item
+
+def partitioned_scan(partitions=4, columns=('user_id', 'name', 'email', 'age'),
+                     key='user_id', ordered=False, chunk_size=1000, table='user_data'):
+    """Generator that scans a table in parallel, one connection per partition.
+
+    Rows are split by MOD(CRC32(key), partitions) and each partition is read
+    by its own worker thread on a connection from the shared pool; the
+    database does the heavy lifting and the driver releases the GIL on socket
+    reads, so threads are enough. Rows come back as tuples in arrival order,
+    or sorted by key when ordered=True (each partition is read in key order
+    and the streams are merged).
+
+    All partition connections are borrowed before any worker starts: the
+    ordered merge needs a chunk from every partition, so a worker left
+    waiting for a connection would stall the rest. partitions may therefore
+    not exceed the pool's max_size.
+    """
+    columns = tuple(columns)
+    for name in columns + (key, table):
+        if not IDENTIFIER.match(name):
+            raise ValueError(f"Invalid identifier: {name}")
+    if key not in columns:
+        raise ValueError("key must be one of the selected columns")
+    pool = get_pool()
+    if partitions > pool.max_size:
+        raise ValueError(f"partitions ({partitions}) exceeds the pool's max_size ({pool.max_size})")
+
+    query = f"SELECT {', '.join(columns)} FROM {table} WHERE MOD(CRC32({key}), %s) = %s"
+    if ordered:
+        query += f" ORDER BY {key}"
+
+    stop = threading.Event()
+    if ordered:
+        queues = [queue.Queue(maxsize=4) for _ in range(partitions)]
+    else:
+        queues = [queue.Queue(maxsize=4 * partitions)]
+
+    connections = []
+    try:
+        for _ in range(partitions):
+            connections.append(pool.acquire())
+        with ThreadPoolExecutor(max_workers=partitions) as workers:
+            for index, connection in enumerate(connections):
+                workers.submit(_scan_partition, connection, query, (partitions, index),
+                               chunk_size, queues[index % len(queues)], stop)
+            try:
+                if ordered:
+                    yield from heapq.merge(*(_drain_partitions(out, 1) for out in queues),
+                                           key=itemgetter(columns.index(key)))
+                else:
+                    yield from _drain_partitions(queues[0], partitions)
+            finally:
+                # Unblock any worker still waiting to hand over a chunk
+                stop.set()
+    finally:
+        # Workers are done once the executor has shut down
+        for connection in connections:
+            pool.release(connection)
+
 # Example usage (remove this part if you don't want to execute on import)
 if __name__ == "__main__":
     db_connection = connect_db()
@@ -107,7 +532,7 @@ if __name__ == "__main__":
     db_connection = connect_to_prodev()
     if db_connection:
         create_table(db_connection)
-        insert_data(db_connection, 'user_data.csv')
+        bulk_insert_data(db_connection, 'user_data.csv')
 
         # Streaming rows
         for user in stream_rows(db_connection):